@@ -1,9 +1,21 @@
 """OpenAI client for generating JSON responses."""
 import os
+import copy
 import json
-from typing import TypeVar, Dict, Any
+import time
+import random
+import asyncio
+from collections import deque, OrderedDict
+from typing import TypeVar, Dict, Any, List, Optional, Set, Tuple
 import httpx
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+
+# orjson is optional; fall back to the stdlib parser if not available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 T = TypeVar('T')
 
@@ -17,11 +29,36 @@ site_title = (os.getenv('OPENROUTER_SITE_TITLE') or '').strip()
 openai_client = None
 if raw_key and not is_openrouter:
     try:
-        openai_client = OpenAI(api_key=raw_key)
+        openai_client = AsyncOpenAI(api_key=raw_key)
     except Exception:
         openai_client = None
 
 
+# Shared keep-alive HTTP client for OpenRouter, created on first use
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client, creating it if needed."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _http_client
+
+
+async def aclose() -> None:
+    """Close the shared HTTP clients (call on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if openai_client is not None:
+        await openai_client.close()
+
+
 def default_model() -> str:
     """Get the default model name."""
     return 'openai/gpt-4o' if is_openrouter else 'gpt-4o-mini'
@@ -31,7 +68,8 @@ async def generate_json(
     system: str,
     user: str,
     model: str = None,
-    temperature: float = 0.6
+    temperature: float = 0.6,
+    response_format: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Generate JSON response from OpenAI or OpenRouter.
@@ -41,6 +79,8 @@ async def generate_json(
         user: User prompt
         model: Model name (optional)
         temperature: Temperature for generation
+        response_format: Structured-output format, e.g. a json_schema
+            (defaults to plain JSON mode)
     
     Returns:
         Parsed JSON response
@@ -58,48 +98,497 @@ async def generate_json(
         if site_title:
             headers['X-Title'] = site_title
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                'https://openrouter.ai/api/v1/chat/completions',
-                headers=headers,
-                json={
-                    'model': model,
-                    'messages': [
-                        {'role': 'system', 'content': system},
-                        {'role': 'user', 'content': user}
-                    ],
-                    'temperature': temperature,
-                },
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data.get('choices', [{}])[0].get('message', {}).get('content', '{}')
-            return json.loads(content if isinstance(content, str) else json.dumps(content))
+        payload = {
+            'model': model,
+            'messages': [
+                {'role': 'system', 'content': system},
+                {'role': 'user', 'content': user}
+            ],
+            'temperature': temperature,
+        }
+        if response_format:
+            payload['response_format'] = response_format
+        
+        response = await _get_http_client().post(
+            'https://openrouter.ai/api/v1/chat/completions',
+            headers=headers,
+            json=payload,
+            timeout=60.0
+        )
+        response.raise_for_status()
+        data = _loads(response.content)
+        content = data.get('choices', [{}])[0].get('message', {}).get('content', '{}')
+        # Some providers return the message content already decoded
+        return _loads(content) if isinstance(content, str) else content
     else:
-        # Use OpenAI API (run in thread pool for async compatibility)
+        # Use OpenAI API (native async client)
         if not openai_client:
             raise ValueError('OPENAI_API_KEY is not set. Add it to your environment.')
         
-        import asyncio
+        # Raw response: parse the body once with _loads instead of having the
+        # SDK build its pydantic ChatCompletion model first
+        raw = await openai_client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=[
+                {'role': 'system', 'content': system},
+                {'role': 'user', 'content': user}
+            ],
+            response_format=response_format or {'type': 'json_object'},
+            temperature=temperature
+        )
+        data = _loads(raw.content)
+        content = data['choices'][0]['message'].get('content') or '{}'
+        return _loads(content)
+
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Check whether a generation error is worth retrying (429, 5xx, network)."""
+    if isinstance(exc, (RateLimitError, APIConnectionError, InternalServerError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+async def generate_json_with_retry(
+    system: str,
+    user: str,
+    model: str = None,
+    temperature: float = 0.6,
+    response_format: Optional[Dict[str, Any]] = None,
+    attempts: int = 3
+) -> Dict[str, Any]:
+    """
+    Call generate_json, retrying transient failures with exponential backoff.
+    
+    Non-transient errors (bad key, malformed JSON, 4xx) are raised immediately;
+    transient ones are raised once all attempts are used up.
+    """
+    for attempt in range(attempts):
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        completion = await loop.run_in_executor(
-            None,
-            lambda: openai_client.chat.completions.create(
+            return await generate_json(
+                system=system,
+                user=user,
                 model=model,
-                messages=[
-                    {'role': 'system', 'content': system},
-                    {'role': 'user', 'content': user}
-                ],
-                response_format={'type': 'json_object'},
-                temperature=temperature
+                temperature=temperature,
+                response_format=response_format
             )
-        )
-        content = completion.choices[0].message.content or '{}'
-        return json.loads(content)
+        except Exception as e:
+            if attempt == attempts - 1 or not _is_transient(e):
+                raise
+            await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.5))
+
+
+def batch_api_available() -> bool:
+    """Whether batch_generate_json can run (it needs a native OpenAI key, not OpenRouter)."""
+    return openai_client is not None and not is_openrouter
+
+
+async def batch_generate_json(
+    items: List[Dict[str, Any]],
+    model: str = None,
+    poll_interval: float = 30.0
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate many JSON responses with a single OpenAI Batch API job.
+    
+    The batch endpoint trades latency (completion window of up to 24h) for
+    half the per-token cost and a separate, much larger rate limit pool, so
+    it is meant for bulk/offline runs rather than interactive requests.
+    
+    Args:
+        items: List of dicts with "system", "user" and optional "temperature"
+            and "response_format"
+        model: Model name (optional)
+        poll_interval: Seconds to wait between batch status checks
+    
+    Returns:
+        Parsed JSON responses in input order (None for entries that failed)
+    """
+    if not batch_api_available():
+        raise ValueError('The Batch API requires a native OPENAI_API_KEY.')
+    if not items:
+        return []
+    
+    model = model or default_model()
+    lines = [
+        json.dumps({
+            'custom_id': str(i),
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': {
+                'model': model,
+                'messages': [
+                    {'role': 'system', 'content': item['system']},
+                    {'role': 'user', 'content': item['user']}
+                ],
+                'response_format': item.get('response_format') or {'type': 'json_object'},
+                'temperature': item.get('temperature', 0.6),
+            },
+        })
+        for i, item in enumerate(items)
+    ]
+    
+    batch_file = await openai_client.files.create(
+        file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+        purpose='batch'
+    )
+    batch = await openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint='/v1/chat/completions',
+        completion_window='24h'
+    )
+    
+    while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+        await asyncio.sleep(poll_interval)
+        batch = await openai_client.batches.retrieve(batch.id)
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    if batch.status != 'completed' or not batch.output_file_id:
+        return results
+    
+    output = await openai_client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = _loads(line)
+        response = record.get('response') or {}
+        if response.get('status_code') != 200:
+            continue
+        try:
+            content = response['body']['choices'][0]['message']['content'] or '{}'
+            results[int(record['custom_id'])] = _loads(content)
+        except (KeyError, IndexError, ValueError, TypeError):
+            continue
+    
+    return results
+
+
+class _RateLimiter:
+    """Sliding one-minute window over request and token counts."""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests: deque = deque()
+        self._tokens_used = 0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one more request of `tokens` fits in the window."""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._requests and now - self._requests[0][0] >= 60.0:
+                    self._tokens_used -= self._requests.popleft()[1]
+                if len(self._requests) < self.rpm and self._tokens_used + tokens <= self.tpm:
+                    self._requests.append((now, tokens))
+                    self._tokens_used += tokens
+                    return
+                await asyncio.sleep(max(0.05, 60.0 - (now - self._requests[0][0])))
+
+
+def _estimate_tokens(item: Dict[str, Any]) -> int:
+    """Rough token estimate for a prompt (~4 characters per token plus output allowance)."""
+    return (len(item['system']) + len(item['user'])) // 4 + 500
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    """Check whether an exception is a 429 from OpenAI or OpenRouter."""
+    if isinstance(exc, RateLimitError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
 
+
+async def gather_generate_json(
+    prompts: List[Dict[str, Any]],
+    max_concurrency: int = 32,
+    rpm: int = 500,
+    tpm: int = 200_000,
+    model: str = None,
+    max_retries: int = 5
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Run many generate_json calls concurrently within rate limits.
+    
+    At most max_concurrency requests are in flight, and sends are gated so
+    that the last minute never exceeds rpm requests or tpm estimated tokens.
+    429 responses are retried with exponential backoff and jitter.
+    
+    Args:
+        prompts: List of dicts with "system", "user" and optional "temperature"
+            and "response_format"
+        max_concurrency: Maximum number of requests in flight
+        rpm: Requests-per-minute limit
+        tpm: Tokens-per-minute limit
+        model: Model name (optional)
+        max_retries: Retries per prompt after a rate-limit response
+    
+    Returns:
+        Parsed JSON responses in input order (None for prompts that failed)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiter = _RateLimiter(rpm, tpm)
+    
+    async def run(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        tokens = _estimate_tokens(item)
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await limiter.acquire(tokens)
+                try:
+                    return await generate_json(
+                        system=item['system'],
+                        user=item['user'],
+                        model=model,
+                        temperature=item.get('temperature', 0.6),
+                        response_format=item.get('response_format')
+                    )
+                except Exception as e:
+                    if not _is_rate_limited(e) or attempt == max_retries:
+                        return None
+                    await asyncio.sleep(min(60.0, 2 ** attempt) + random.uniform(0, 1))
+        return None
+    
+    return list(await asyncio.gather(*(run(item) for item in prompts)))
+
+
+# Appended to the system prompt when several cases share one call
+_PACKED_INSTRUCTIONS = (
+    '\n\nYou will receive several numbered cases separated by "---". '
+    'Analyze each case independently and return a JSON object of the form '
+    '{"results": [...]} with exactly one object per case, in the same order as the cases, '
+    'each strictly matching the keys above plus an integer "case" key holding the case number.'
+)
+
+
+def _packed_format(response_format: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Wrap a json_schema response format so it describes {"results": [...]}."""
+    if not response_format or response_format.get('type') != 'json_schema':
+        return None
+    inner = response_format['json_schema']
+    # Each entry carries its case number so answers can't be matched up by position
+    item = dict(inner['schema'])
+    item['properties'] = {'case': {'type': 'integer'}, **item.get('properties', {})}
+    item['required'] = ['case', *item.get('required', [])]
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': inner['name'] + '_batch',
+            'strict': inner.get('strict', False),
+            'schema': {
+                'type': 'object',
+                'properties': {'results': {'type': 'array', 'items': item}},
+                'required': ['results'],
+                'additionalProperties': False
+            }
+        }
+    }
+
+
+async def generate_json_packed(
+    system: str,
+    users: List[str],
+    model: str = None,
+    temperature: float = 0.6,
+    response_format: Optional[Dict[str, Any]] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Answer several user prompts that share a system prompt with one call.
+    
+    Args:
+        system: System prompt shared by every case
+        users: User prompts, one per case
+        model: Model name (optional)
+        temperature: Temperature for generation
+        response_format: Per-case json_schema format (wrapped into an array)
+    
+    Returns:
+        One result per case, in input order, matched by the entries' case
+        numbers. If the answer does not hold exactly one entry per case
+        (wrong length, or a case number missing or repeated) every result is
+        None, since no entry can be trusted to belong to its case. Errors
+        from the call itself are raised.
+    """
+    user = '\n---\n'.join(f'Case {n}:\n{u}' for n, u in enumerate(users, 1))
+    result = await generate_json_with_retry(
+        system=system + _PACKED_INSTRUCTIONS,
+        user=user,
+        model=model,
+        temperature=temperature,
+        response_format=_packed_format(response_format)
+    )
+    entries = result.get('results') if isinstance(result, dict) else None
+    if not isinstance(entries, list) or len(entries) != len(users):
+        return [None] * len(users)
+    
+    by_case: Dict[int, Dict[str, Any]] = {}
+    for entry in entries:
+        case = entry.get('case') if isinstance(entry, dict) else None
+        if type(case) is not int or not 1 <= case <= len(users) or case in by_case:
+            return [None] * len(users)
+        by_case[case] = {k: v for k, v in entry.items() if k != 'case'}
+    return [by_case[n] for n in range(1, len(users) + 1)]
+
+
+class _MicroBatcher:
+    """
+    Coalesce generate_json calls that arrive within a short window.
+    
+    Calls sharing a system prompt, temperature and response format are sent
+    as one packed request; calls with the same cache key share a single
+    in-flight call and recent answers are served from an LRU cache with a TTL.
+    """
+    
+    def __init__(
+        self,
+        window_ms: float = 25.0,
+        max_batch: int = 32,
+        cache_size: int = 4096,
+        cache_ttl: float = 3600.0
+    ):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: OrderedDict = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self._flushes: Set[asyncio.Task] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def submit(
+        self,
+        system: str,
+        user: str,
+        temperature: float,
+        response_format: Optional[Dict[str, Any]],
+        cache_key: Optional[Tuple] = None
+    ) -> Dict[str, Any]:
+        """Queue one prompt and wait for its (possibly shared) answer."""
+        format_key = json.dumps(response_format, sort_keys=True) if response_format else None
+        group = (system, temperature, format_key)
+        key = (group, cache_key if cache_key is not None else user)
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return copy.deepcopy(cached[1])
+            del self._cache[key]
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # The queue and futures belong to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._pending = {}
+            self._worker = loop.create_task(self._run())
+        
+        future = self._pending.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._pending[key] = future
+            self._queue.put_nowait((key, user, response_format, future))
+        # Shield so one cancelled caller does not cancel a call others share
+        return copy.deepcopy(await asyncio.shield(future))
+    
+    async def _run(self) -> None:
+        """Collect queued prompts for up to one window, then flush them by group."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            groups: Dict[Tuple, List[Tuple]] = {}
+            for entry in batch:
+                groups.setdefault(entry[0][0], []).append(entry)
+            for entries in groups.values():
+                task = loop.create_task(self._flush(entries))
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+    
+    async def _flush(self, entries: List[Tuple]) -> None:
+        """Answer one group of prompts and resolve their futures."""
+        system, temperature, _ = entries[0][0][0]
+        response_format = entries[0][2]
+        results: List[Any] = [None] * len(entries)
+        
+        if len(entries) > 1:
+            try:
+                results = await generate_json_packed(
+                    system=system,
+                    users=[entry[1] for entry in entries],
+                    temperature=temperature,
+                    response_format=response_format
+                )
+            except Exception:
+                # e.g. a truncated packed answer; answer the cases one by one below
+                pass
+        # A packed answer that can't be matched to its cases comes back all None,
+        # so every case gets its own single call and nothing is cached under the
+        # wrong key
+        
+        async def single(entry: Tuple) -> Any:
+            try:
+                return await generate_json_with_retry(
+                    system=system,
+                    user=entry[1],
+                    temperature=temperature,
+                    response_format=response_format
+                )
+            except Exception as e:
+                return e
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            answers = await asyncio.gather(*(single(entries[i]) for i in missing))
+            for i, answer in zip(missing, answers):
+                results[i] = answer
+        
+        for (key, _, _, future), result in zip(entries, results):
+            self._pending.pop(key, None)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+                continue
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(result)
+
+
+_batcher = _MicroBatcher()
+
+
+async def coalesced_generate_json(
+    system: str,
+    user: str,
+    temperature: float = 0.6,
+    response_format: Optional[Dict[str, Any]] = None,
+    cache_key: Optional[Tuple] = None
+) -> Dict[str, Any]:
+    """
+    Generate a JSON response through the shared micro-batcher.
+    
+    Concurrent calls with the same system prompt are packed into one request
+    (falling back to single calls for any case the packed answer misses) and
+    repeated prompts are answered from cache. Errors are raised as from
+    generate_json_with_retry.
+    
+    Args:
+        cache_key: Hashable key identifying equivalent requests (e.g. the
+            mutation sets); calls with the same system prompt and key share
+            one answer. Defaults to the exact user prompt.
+    """
+    return await _batcher.submit(system, user, temperature, response_format, cache_key)
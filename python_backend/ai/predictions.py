@@ -1,16 +1,341 @@
 """AI prediction functions for resistance forecasting."""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import asyncio
+import functools
 import re
+import string
 import sys
-import os
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from statistics import fmean
+import httpx
+from openai import OpenAIError
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from ai.openai_client import generate_json
-from ai.ml_models import get_svm_model, get_rf_model, get_ensemble_model
+from .openai_client import (
+    coalesced_generate_json,
+    batch_api_available,
+    batch_generate_json,
+    gather_generate_json,
+    generate_json_packed
+)
+from .ml_models import get_svm_model, get_rf_model, get_ensemble_model
 from data.scrapers import get_dataset_manager
 
+# Patterns used on every request (compiled once at import)
+_VAN_RE = re.compile(r'van|thicken|cell\s*wall', re.I)
+_TOKEN_SPLIT_RE = re.compile(r'[\n,;]+')
+_MUT_NAME_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+
+# Failures that degrade to the heuristic fallbacks: API/transport errors, a
+# missing API key (ValueError), bad JSON and malformed response fields
+_LLM_ERRORS = (OpenAIError, httpx.HTTPError, ValueError, TypeError, KeyError, AttributeError, IndexError)
+
+
+class FallbackResult(dict):
+    """A heuristic result returned because the model call failed; response caches skip these."""
+    cacheable = False
+
+
+def _looks_like_mutation(token: str) -> bool:
+    """
+    Whether a token contains gene(mutation): a name character, "(", at least
+    one character and a later ")".
+    
+    A regex search for this rescans the rest of the token from every "(" and
+    is quadratic on tokens like "a(a(a(..."; this walks the "(" positions once.
+    """
+    close = token.rfind(')')
+    start = token.find('(', 1)
+    while 0 < start < close - 1:
+        if token[start - 1] in _MUT_NAME_CHARS:
+            return True
+        start = token.find('(', start + 1)
+    return False
+
+
+# Resolved ML model handles (single-load; the getters are only called once)
+@functools.cache
+def _svm():
+    return get_svm_model()
+
+
+@functools.cache
+def _rf():
+    return get_rf_model()
+
+
+@functools.cache
+def _ensemble():
+    return get_ensemble_model()
+
+
+_MODELS = {"svm": _svm, "random_forest": _rf}
+
+
+class _ModelBatcher:
+    """
+    Coalesce concurrent ML predictions into one predict_batch call per model.
+    
+    Requests queued within max_delay_ms of each other (up to max_batch) are
+    run as a single feature matrix, which turns N Random Forest
+    predict_proba calls into one. Cached profiles skip the queue entirely.
+    
+    The models run on one dedicated worker thread, so sklearn inference (and
+    the first-use model fit) never blocks the event loop; requests arriving
+    while it is busy simply accumulate into the next batch.
+    """
+    
+    def __init__(self, max_batch: int = 64, max_delay_ms: float = 2.0):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ml-model')
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def predict(
+        self,
+        model: Any,
+        mec_a_mutations: List[str],
+        pbp2a_mutations: List[str],
+        sccmec_type: Optional[str] = None,
+        additional_genes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Predict one profile with `model`, batched with concurrent requests."""
+        profile = (mec_a_mutations, pbp2a_mutations, sccmec_type, additional_genes)
+        cached = model.predict_cached(*profile)
+        if cached is not None:
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # The queue and futures belong to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((model, profile, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Collect queued requests for up to max_delay, then run them per model."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            by_model: Dict[Any, List[Tuple]] = {}
+            for model, profile, future in batch:
+                by_model.setdefault(model, []).append((profile, future))
+            for model, entries in by_model.items():
+                await self._flush(loop, model, entries)
+    
+    async def _flush(self, loop: asyncio.AbstractEventLoop, model: Any, entries: List[Tuple]) -> None:
+        """Run one model over its queued profiles on the worker thread and resolve the futures."""
+        try:
+            results = await loop.run_in_executor(
+                self._executor, model.predict_batch, [profile for profile, _ in entries]
+            )
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(entries, results):
+            if not future.done():
+                future.set_result(result)
+
+
+_model_batcher = _ModelBatcher()
+
+# Threat level thresholds (a score at a threshold gets the higher level)
+_THREAT_BINS = (0.25, 0.5, 0.75)
+_THREAT_LEVELS = ('Very Low', 'Low', 'Moderate', 'High')
+
+
+def _threat(score: float) -> str:
+    """Map a probability/weight score to its threat level label."""
+    return _THREAT_LEVELS[bisect_right(_THREAT_BINS, score)]
+
+
+# Contributing-feature weights by position (the first N mutations are listed)
+_MECA_WEIGHTS = tuple(min(1, 0.45 + i * 0.06) for i in range(6))
+_PBP2A_WEIGHTS = tuple(min(1, 0.4 + i * 0.06) for i in range(6))
+_MECA_WEIGHTS_ML = tuple(min(1, 0.5 + i * 0.05) for i in range(4))
+_PBP2A_WEIGHTS_ML = tuple(min(1, 0.45 + i * 0.05) for i in range(4))
+
+# Heuristic emergence chart/feature scores by position
+_CONTRIBUTION_SCORES = tuple(max(0, min(1, 0.5 + i * 0.1)) for i in range(6))
+_COOCCURRENCE_SCORES = tuple(max(0, min(1, 0.3 + i * 0.08)) for i in range(6))
+_EMERGENCE_WEIGHTS = tuple(max(0, min(1, 0.5 + i * 0.08)) for i in range(6))
+
+# Emergence base confidence and mean heuristic weight by mutation count (capped at 6)
+_EMERGENCE_BASE_CONFIDENCE = tuple(min(0.95, max(0.55, 0.55 + n * 0.06)) for n in range(7))
+_EMERGENCE_MEAN_WEIGHTS = (0.0,) + tuple(fmean(_EMERGENCE_WEIGHTS[:n]) for n in range(1, 7))
+
+
+def _mutation_contrib(
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    mec_weights: Tuple[float, ...],
+    pbp_weights: Tuple[float, ...]
+) -> List[Dict[str, Any]]:
+    """Build contributing features for the leading mecA/PBP2a mutations."""
+    contrib = [{'name': f'mecA:{m}', 'weight': w} for m, w in zip(mec_a_mutations, mec_weights)]
+    contrib.extend({'name': f'PBP2a:{m}', 'weight': w} for m, w in zip(pbp2a_mutations, pbp_weights))
+    return contrib
+
+
+def _canon(mutation: str) -> str:
+    """Canonical, interned spelling of a mutation name (e.g. " g246e" -> "G246E")."""
+    return sys.intern(mutation.strip().upper())
+
+
+def _mutation_key(mutations: List[str]) -> frozenset:
+    """Order- and case-insensitive cache key for a mutation list."""
+    return frozenset(map(_canon, mutations))
+
+
+# Oxacillin high-risk mutations and SCCmec cassette risk (score, notes)
+_HIGH_RISK_MECA = frozenset({'G246E', 'I112V', 'D223N', 'E125K'})
+_HIGH_RISK_PBP2A = frozenset({'E447K', 'V311A', 'N246D', 'A389T'})
+_SCCMEC_RISKS = {
+    'I': (0.6, 'HA-MRSA associated, moderate resistance'),
+    'II': (0.8, 'HA-MRSA, high resistance, common in healthcare settings'),
+    'III': (0.85, 'HA-MRSA, high resistance, large cassette'),
+    'IV': (0.7, 'CA-MRSA associated (USA300), moderate-high resistance'),
+    'IVa': (0.72, 'CA-MRSA variant'),
+    'V': (0.75, 'CA-MRSA, moderate-high resistance'),
+}
+
+# Structured-output schemas mirroring the keys the system prompts ask for
+_CHART_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'data': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {'name': {'type': 'string'}, 'value': {'type': 'number'}},
+                'required': ['name', 'value'],
+                'additionalProperties': False
+            }
+        }
+    },
+    'required': ['title', 'data'],
+    'additionalProperties': False
+}
+
+_BAYESIAN_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'bayesian_resistance_prediction',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'oxacillinResistanceProbability': {'type': 'number'},
+                'vancomycinResistanceProbability': {'type': 'number'},
+                'ceftarolineResistanceProbability': {'type': 'number'},
+                'rationale': {'type': 'string'},
+                'solution': {'type': 'string'},
+                'charts': {'type': 'array', 'items': _CHART_SCHEMA}
+            },
+            'required': [
+                'oxacillinResistanceProbability', 'vancomycinResistanceProbability',
+                'ceftarolineResistanceProbability', 'rationale', 'solution', 'charts'
+            ],
+            'additionalProperties': False
+        }
+    }
+}
+
+_EMERGENCE_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'resistance_emergence_prediction',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'resistancePrediction': {'type': 'string'},
+                'confidenceLevel': {'type': 'number'},
+                'inDepthExplanation': {'type': 'string'},
+                'suggestedInterventions': {'type': 'string'},
+                'charts': {'type': 'array', 'items': _CHART_SCHEMA}
+            },
+            'required': [
+                'resistancePrediction', 'confidenceLevel', 'inDepthExplanation',
+                'suggestedInterventions', 'charts'
+            ],
+            'additionalProperties': False
+        }
+    }
+}
+
+# Bayesian system prompt, pre-joined once; only the dataset counts are filled
+# in (whenever the dataset version changes, see _bayesian_system)
+_BAYESIAN_SYSTEM_TEMPLATE = string.Template('\n'.join([
+    'You are a computational biology assistant specializing in MRSA antibiotic resistance modeling for an ISEF-level scientific application. Outputs must be probabilistic and cautious.',
+    '',
+    'This prediction uses real data from three major databases:',
+    '1. NCBI Pathogen Detection - MRSA isolate genomic data',
+    '2. CARD (Comprehensive Antibiotic Resistance Database) - Resistance gene mutations',
+    '3. PubMLST - Sequence types and mutation frequencies',
+    '',
+    # Real dataset information
+    '\n'
+    '    Real dataset information:\n'
+    '    - CARD Database: ${known_mecA_count} known mecA mutations, ${known_pbp2a_count} known PBP2a mutations\n'
+    '    - PubMLST: Mutation frequencies from ${freq_count} mutations in database\n'
+    '    ',
+    '',
+    'Return a JSON object strictly matching keys:',
+    '{"oxacillinResistanceProbability": number, "vancomycinResistanceProbability": number, "ceftarolineResistanceProbability": number, "rationale": string, "solution": string, "charts": [{"title": string, "data": [{"name": string, "value": number}]}]}',
+    '',
+    'Scientific constraints:',
+    '- Oxacillin resistance is strongly associated with mecA presence and PBP2a mutations.',
+    '- High probabilities only with multiple resistance-associated mutations and supporting evidence.',
+    '- Vancomycin probability low unless data suggests mechanisms like cell wall thickening or van genes.',
+    '- Use mutation frequencies from PubMLST to inform probability calculations.',
+]))
+
+# Explanation used when the emergence model returns none (and by the fallback)
+_EMERGENCE_DEFAULT_EXPLANATION = (
+    'Evolutionary Trajectory Explanation: mecA acquisition → PBP2a structural mutation → '
+    'regulatory adaptation → phenotypic resistance shift (under β-lactam/glycopeptide selection pressure).\n\n'
+    'Existing Knowledge vs Model Inference: literature-supported associations include altered β-lactam binding '
+    'via PBP2a mutations; model-inferred signals reflect heuristic interpretation of co-occurring variants and '
+    'observed trajectories.\n\n'
+    'Scientific Disclaimer: results are probabilistic, observational, and not diagnostic. No clinical recommendations.'
+)
+
+# Static system prompt for the evolutionary emergence predictor
+_EMERGENCE_SYSTEM = '\n'.join([
+    'You are an AI systems engineer and computational biology reviewer optimizing an Evolutionary Antibiotic Resistance Predictor for MRSA. Outputs must meet ISEF judging standards with rigorous, cautious, publication-style language.',
+    '',
+    'Required content guidelines:',
+    '- Mutation Pattern Analysis: list specific mutations using standard notation (e.g., mecA(G246E), PBP2a(V311A)). Classify each as Structural, Regulatory, or Accessory/virulence-associated. Include both relative contribution scores (normalized 0–1) and co-occurrence frequency across isolates.',
+    '- Existing Biological Knowledge Integration: explicitly distinguish literature-supported associations from model-inferred/heuristic signals. State mechanisms conservatively: altered β-lactam binding, cell wall thickening, etc.',
+    '- Evolutionary Trajectory Modeling: represent resistance emergence stepwise (e.g., mecA acquisition → PBP2a structural mutation → regulatory adaptation → phenotypic shift) and reference selection pressure (β-lactam or glycopeptide exposure).',
+    '- Scientific Rigor: include explicit disclaimer that results are probabilistic, observational, non-diagnostic. No treatment guidance.',
+    '- Visualization: produce charts that map directly to text with clear labels: "Relative Contribution Score" and "Co-occurrence Frequency Across Isolates". Values must be in [0,1].',
+    '- Interventions: suggest research actions only (genomic surveillance, temporal tracking, phenotypic validation assays, literature cross-validation).',
+    '',
+    'Return a JSON object strictly matching keys:',
+    '{"resistancePrediction": string, "confidenceLevel": number, "inDepthExplanation": string, "suggestedInterventions": string, "charts": [{"title": string, "data": [{"name": string, "value": number}]}]}',
+])
+
 
 async def predict_resistance_bayesian(
     mec_a_mutations: List[str],
@@ -33,49 +358,279 @@ async def predict_resistance_bayesian(
     if not mec_a_mutations and not pbp2a_mutations:
         raise ValueError('Please provide at least one mecA or PBP2a mutation (e.g., ["G246E"]).')
     
-    # Get real data from datasets
-    dataset_manager = get_dataset_manager()
-    mutation_freqs = dataset_manager.get_all_mutation_frequencies()
-    
-    # Enhance input with real mutation frequencies
-    enhanced_input = []
-    for mut in mec_a_mutations:
-        freq = mutation_freqs.get(f"mecA({mut})", 0.0)
-        enhanced_input.append(f"mecA({mut}) [frequency: {freq:.2%}]")
-    for mut in pbp2a_mutations:
-        freq = mutation_freqs.get(f"PBP2a({mut})", 0.0)
-        enhanced_input.append(f"PBP2a({mut}) [frequency: {freq:.2%}]")
-    
-    # Get known mutations from CARD
-    known_mecA = dataset_manager.get_known_mutations("mecA")
-    known_pbp2a = dataset_manager.get_known_mutations("PBP2a")
-    
-    # Build system prompt with real dataset information
-    dataset_info = f"""
-    Real dataset information:
-    - CARD Database: {len(known_mecA)} known mecA mutations, {len(known_pbp2a)} known PBP2a mutations
-    - PubMLST: Mutation frequencies from {len(mutation_freqs)} mutations in database
-    """
-    
-    system = [
-        'You are a computational biology assistant specializing in MRSA antibiotic resistance modeling for an ISEF-level scientific application. Outputs must be probabilistic and cautious.',
-        '',
-        'This prediction uses real data from three major databases:',
-        '1. NCBI Pathogen Detection - MRSA isolate genomic data',
-        '2. CARD (Comprehensive Antibiotic Resistance Database) - Resistance gene mutations',
-        '3. PubMLST - Sequence types and mutation frequencies',
-        '',
-        dataset_info,
-        '',
-        'Return a JSON object strictly matching keys:',
-        '{"oxacillinResistanceProbability": number, "vancomycinResistanceProbability": number, "ceftarolineResistanceProbability": number, "rationale": string, "solution": string, "charts": [{"title": string, "data": [{"name": string, "value": number}]}]}',
-        '',
-        'Scientific constraints:',
-        '- Oxacillin resistance is strongly associated with mecA presence and PBP2a mutations.',
-        '- High probabilities only with multiple resistance-associated mutations and supporting evidence.',
-        '- Vancomycin probability low unless data suggests mechanisms like cell wall thickening or van genes.',
-        '- Use mutation frequencies from PubMLST to inform probability calculations.',
-    ]
+    prepared = _prepare_bayesian(mec_a_mutations, pbp2a_mutations, vancomycin_resistance_profile)
+    system = await _bayesian_system_async()
+    
+    # Draft-then-verify: skip the model when the heuristic is already confident,
+    # every mutation is a known CARD mutation and there is no profile text to read
+    profiles = (vancomycin_resistance_profile, ceftaroline_resistance_profile, oxacillin_resistance_profile)
+    if await _draft_is_confident(mec_a_mutations, pbp2a_mutations, prepared, profiles):
+        return _bayesian_fallback(prepared, draft=True)
+    
+    system, user = _build_bayesian_prompt(
+        mec_a_mutations,
+        pbp2a_mutations,
+        vancomycin_resistance_profile,
+        ceftaroline_resistance_profile,
+        oxacillin_resistance_profile,
+        system=system
+    )
+    
+    try:
+        result = await coalesced_generate_json(
+            system=system,
+            user=user,
+            temperature=0.2,
+            response_format=_BAYESIAN_RESPONSE_FORMAT,
+            cache_key=(
+                _mutation_key(mec_a_mutations),
+                _mutation_key(pbp2a_mutations),
+                vancomycin_resistance_profile,
+                ceftaroline_resistance_profile,
+                oxacillin_resistance_profile
+            )
+        )
+        return _finalize_bayesian(result, prepared)
+    except _LLM_ERRORS:
+        # Fallback heuristic once retries are exhausted
+        return FallbackResult(_bayesian_fallback(prepared))
+
+
+async def predict_resistance_bayesian_batch(
+    inputs: List[Dict[str, Any]],
+    use_batch_api: bool = False,
+    max_concurrency: int = 32
+) -> List[Dict[str, Any]]:
+    """
+    Run Bayesian predictions for many isolates at once.
+    
+    By default the requests are fanned out concurrently within rate limits.
+    With use_batch_api=True all prompts are submitted as one OpenAI Batch API
+    job instead: cheaper and with separate rate limits, but it is polled until
+    done (up to the 24h completion window), so only use it for offline runs.
+    It raises ValueError without a native OPENAI_API_KEY rather than falling
+    back to the heuristic for every input.
+    
+    Args:
+        inputs: List of dicts with the keyword arguments of
+            predict_resistance_bayesian (mec_a_mutations, pbp2a_mutations, ...)
+        use_batch_api: Submit through the Batch API instead of concurrent calls
+        max_concurrency: Maximum requests in flight when not using the Batch API
+    
+    Returns:
+        One prediction result per input, in input order
+    """
+    if use_batch_api and not batch_api_available():
+        # Falling back here would silently turn every item into the heuristic
+        raise ValueError('use_batch_api requires a native OPENAI_API_KEY (the Batch API is not available via OpenRouter).')
+    
+    items = []
+    for item in inputs:
+        if not item.get('mec_a_mutations') and not item.get('pbp2a_mutations'):
+            raise ValueError('Please provide at least one mecA or PBP2a mutation (e.g., ["G246E"]).')
+        system, user = _build_bayesian_prompt(
+            item.get('mec_a_mutations') or [],
+            item.get('pbp2a_mutations') or [],
+            item.get('vancomycin_resistance_profile'),
+            item.get('ceftaroline_resistance_profile'),
+            item.get('oxacillin_resistance_profile')
+        )
+        items.append({
+            'system': system,
+            'user': user,
+            'temperature': 0.2,
+            'response_format': _BAYESIAN_RESPONSE_FORMAT
+        })
+    
+    try:
+        if use_batch_api:
+            raw_results = await batch_generate_json(items)
+        else:
+            raw_results = await gather_generate_json(items, max_concurrency=max_concurrency)
+    except _LLM_ERRORS:
+        raw_results = [None] * len(inputs)
+    
+    results = []
+    for item, raw in zip(inputs, raw_results):
+        prepared = _prepare_bayesian(
+            item.get('mec_a_mutations') or [],
+            item.get('pbp2a_mutations') or [],
+            item.get('vancomycin_resistance_profile')
+        )
+        try:
+            if raw is None:
+                raise ValueError('No output for this input')
+            results.append(_finalize_bayesian(raw, prepared))
+        except _LLM_ERRORS:
+            results.append(FallbackResult(_bayesian_fallback(prepared)))
+    return results
+
+
+def predict_resistance_bayesian_stream(
+    inputs: List[Dict[str, Any]],
+    max_concurrency: int = 8
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run Bayesian predictions concurrently and yield each one as it finishes.
+    
+    Inputs are validated up front (raising ValueError before anything is
+    sent), so callers can reject a bad request before starting a response.
+    
+    Args:
+        inputs: List of dicts with the keyword arguments of
+            predict_resistance_bayesian (mec_a_mutations, pbp2a_mutations, ...)
+        max_concurrency: Maximum predictions in flight
+    
+    Returns:
+        Async iterator of {"index": input position, "result": prediction},
+        in completion order
+    """
+    for item in inputs:
+        if not item.get('mec_a_mutations') and not item.get('pbp2a_mutations'):
+            raise ValueError('Please provide at least one mecA or PBP2a mutation (e.g., ["G246E"]).')
+    
+    async def stream() -> AsyncIterator[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(index: int, item: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+            async with semaphore:
+                return index, await predict_resistance_bayesian(**item)
+        
+        tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(inputs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                yield {'index': index, 'result': result}
+        finally:
+            # Client went away or a prediction raised: stop the rest
+            for task in tasks:
+                task.cancel()
+    
+    return stream()
+
+
+async def predict_resistance_bayesian_marshaled(
+    inputs: List[Dict[str, Any]],
+    batch_size: int = 16
+) -> List[Dict[str, Any]]:
+    """
+    Run Bayesian predictions for many isolates, several isolates per API call.
+    
+    The shared system prompt is sent once per chunk and the model is asked
+    for a JSON array of per-case results, so prompt tokens and round-trips
+    are amortized across up to batch_size isolates.
+    
+    Args:
+        inputs: List of dicts with the keyword arguments of
+            predict_resistance_bayesian (mec_a_mutations, pbp2a_mutations, ...)
+        batch_size: Maximum number of isolates per API call
+    
+    Returns:
+        One prediction result per input, in input order
+    """
+    if not inputs:
+        return []
+    
+    prompts = []
+    for item in inputs:
+        if not item.get('mec_a_mutations') and not item.get('pbp2a_mutations'):
+            raise ValueError('Please provide at least one mecA or PBP2a mutation (e.g., ["G246E"]).')
+        prompts.append(_build_bayesian_prompt(
+            item.get('mec_a_mutations') or [],
+            item.get('pbp2a_mutations') or [],
+            item.get('vancomycin_resistance_profile'),
+            item.get('ceftaroline_resistance_profile'),
+            item.get('oxacillin_resistance_profile')
+        ))
+    
+    raw_results = await _generate_marshaled(
+        system=prompts[0][0],
+        users=[user for _, user in prompts],
+        batch_size=batch_size,
+        temperature=0.2
+    )
+    
+    results = []
+    for item, raw in zip(inputs, raw_results):
+        prepared = _prepare_bayesian(
+            item.get('mec_a_mutations') or [],
+            item.get('pbp2a_mutations') or [],
+            item.get('vancomycin_resistance_profile')
+        )
+        try:
+            if raw is None:
+                raise ValueError('No marshaled output for this input')
+            results.append(_finalize_bayesian(raw, prepared))
+        except _LLM_ERRORS:
+            results.append(FallbackResult(_bayesian_fallback(prepared)))
+    return results
+
+
+# Rough prompt budget for one marshaled call (~4 characters per token)
+_MARSHAL_TOKEN_BUDGET = 6000
+
+
+def _marshal_chunks(users: List[str], batch_size: int) -> List[List[int]]:
+    """Split case indices into chunks bounded by batch_size and the token budget."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, user in enumerate(users):
+        tokens = len(user) // 4 + 8
+        if current and (len(current) >= batch_size or current_tokens + tokens > _MARSHAL_TOKEN_BUDGET):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _generate_marshaled(
+    system: str,
+    users: List[str],
+    batch_size: int,
+    temperature: float
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Send several cases per generate_json call and split the answers back out.
+    
+    Returns:
+        One raw result per case, in input order (None where the model did not
+        return a usable entry or the call failed)
+    """
+    async def run_chunk(indices: List[int]) -> List[Optional[Dict[str, Any]]]:
+        try:
+            return await generate_json_packed(
+                system=system,
+                users=[users[i] for i in indices],
+                temperature=temperature
+            )
+        except _LLM_ERRORS:
+            return [None] * len(indices)
+    
+    chunks = _marshal_chunks(users, max(1, batch_size))
+    chunk_results = await asyncio.gather(*(run_chunk(indices) for indices in chunks))
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(users)
+    for indices, entries in zip(chunks, chunk_results):
+        for i, entry in zip(indices, entries):
+            results[i] = entry
+    return results
+
+
+def _build_bayesian_prompt(
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    vancomycin_resistance_profile: Optional[str] = None,
+    ceftaroline_resistance_profile: Optional[str] = None,
+    oxacillin_resistance_profile: Optional[str] = None,
+    system: Optional[str] = None
+) -> Tuple[str, str]:
+    """Build the (system, user) prompt pair for a Bayesian prediction."""
+    # Dataset-derived counts only change when the dataset version does
+    system = system or _bayesian_system()
     
     user = (
         f'mecA Mutations: {", ".join(mec_a_mutations)}\n'
@@ -85,108 +640,227 @@ async def predict_resistance_bayesian(
         f'Ceftaroline Profile: {ceftaroline_resistance_profile or ""}'
     )
     
-    try:
-        result = await generate_json(
-            system='\n'.join(system),
-            user=user,
-            temperature=0.6
+    return system, user
+
+
+# Bayesian system prompt for the last dataset version seen
+_bayesian_system_cache: Dict[int, str] = {}
+
+
+def _bayesian_system() -> str:
+    """Get the Bayesian system prompt for the current dataset version."""
+    dataset_manager = get_dataset_manager()
+    version = dataset_manager.get_dataset_version()
+    system = _bayesian_system_cache.get(version)
+    if system is None:
+        system = _cache_bayesian_system(
+            version,
+            dataset_manager.get_known_mutations("mecA"),
+            dataset_manager.get_known_mutations("PBP2a"),
+            dataset_manager.get_all_mutation_frequencies()
         )
-        
-        oxa = float(result.get('oxacillinResistanceProbability', 0))
-        van = float(result.get('vancomycinResistanceProbability', 0))
-        cef = float(result.get('ceftarolineResistanceProbability', 0))
-        
-        # Ensure charts exist
-        if not result.get('charts') or not isinstance(result['charts'], list) or len(result['charts']) == 0:
-            result['charts'] = [{
-                'title': 'Resistance Probabilities',
-                'data': [
-                    {'name': 'Oxacillin', 'value': oxa},
-                    {'name': 'Vancomycin', 'value': van},
-                    {'name': 'Ceftaroline', 'value': cef}
-                ]
-            }]
-        
-        # Calculate confidence
-        mec_count = len(mec_a_mutations)
-        pbp_count = len(pbp2a_mutations)
-        raw_avg = (oxa + van + cef) / 3
-        confidence = min(0.95, max(0.55, 0.6 + raw_avg * 0.25 + min(6, mec_count + pbp_count) * 0.02))
-        
-        # Contributing features
-        contrib = []
-        for i, m in enumerate(mec_a_mutations[:6]):
-            contrib.append({'name': f'mecA:{m}', 'weight': min(1, 0.45 + i * 0.06)})
-        for i, m in enumerate(pbp2a_mutations[:6]):
-            contrib.append({'name': f'PBP2a:{m}', 'weight': min(1, 0.4 + i * 0.06)})
-        
-        # Threat level
-        max_prob = max(oxa, van, cef)
-        threat_level = 'High' if max_prob >= 0.75 else 'Moderate' if max_prob >= 0.5 else 'Low' if max_prob >= 0.25 else 'Very Low'
-        
-        breakdown = (
-            f'Input summary: {mec_count} mecA mutation(s), {pbp_count} PBP2a mutation(s).\n\n'
-            f'Probabilities estimated: Oxacillin {oxa * 100:.1f}%, Vancomycin {van * 100:.1f}%, Ceftaroline {cef * 100:.1f}%.\n\n'
-            f'Threat level: {threat_level} (based on the highest probability).\n\n'
-            f'Confidence: {confidence * 100:.1f}% — calibrated from model outputs and input mutation burden.\n\n'
-            f'Rationale: {result.get("rationale", "")}'
+    return system
+
+
+async def _bayesian_system_async() -> str:
+    """Like _bayesian_system, but runs the dataset queries in worker threads."""
+    dataset_manager = get_dataset_manager()
+    version = dataset_manager.get_dataset_version()
+    system = _bayesian_system_cache.get(version)
+    if system is None:
+        known_mecA, known_pbp2a, frequencies = await asyncio.gather(
+            asyncio.to_thread(dataset_manager.get_known_mutations, "mecA"),
+            asyncio.to_thread(dataset_manager.get_known_mutations, "PBP2a"),
+            asyncio.to_thread(dataset_manager.get_all_mutation_frequencies)
         )
-        
-        result['oxacillinResistanceProbability'] = oxa
-        result['contributingFeatures'] = contrib
-        result['threatLevel'] = threat_level
-        result['breakdownAnalysis'] = breakdown
-        result['charts'] = result['charts'][:1]
-        result['confidenceLevel'] = confidence
-        
-        if not result.get('rationale') or not result['rationale'].strip():
-            result['rationale'] = (
-                'This analysis is probabilistic and observational. Oxacillin resistance is strongly linked to mecA presence. '
-                'Vancomycin probabilities remain low without explicit mechanisms; ceftaroline probabilities reflect mutation burden.'
-            )
-        
-        return result
-    except Exception:
-        # Fallback heuristic
-        return _bayesian_fallback(mec_a_mutations, pbp2a_mutations, vancomycin_resistance_profile)
+        system = _cache_bayesian_system(version, known_mecA, known_pbp2a, frequencies)
+    return system
+
+
+def _cache_bayesian_system(
+    version: int,
+    known_mecA: List[Dict[str, Any]],
+    known_pbp2a: List[Dict[str, Any]],
+    frequencies: Dict[str, float]
+) -> str:
+    """Build the system prompt from the dataset lookups and keep it for this version."""
+    system = _build_bayesian_system(len(known_mecA), len(known_pbp2a), len(frequencies))
+    _bayesian_system_cache.clear()
+    _bayesian_system_cache[version] = system
+    return system
+
+
+@functools.lru_cache(maxsize=1)
+def _build_bayesian_system(known_mecA_count: int, known_pbp2a_count: int, freq_count: int) -> str:
+    """Build the joined Bayesian system prompt from the dataset counts."""
+    return _BAYESIAN_SYSTEM_TEMPLATE.substitute(
+        known_mecA_count=known_mecA_count,
+        known_pbp2a_count=known_pbp2a_count,
+        freq_count=freq_count
+    )
 
 
-def _bayesian_fallback(
+def _prepare_bayesian(
     mec_a_mutations: List[str],
     pbp2a_mutations: List[str],
     vancomycin_resistance_profile: Optional[str] = None
+) -> Tuple[int, int, List[Dict[str, Any]], bool]:
+    """
+    Compute the input-derived state shared by the model and fallback paths.
+    
+    Returns:
+        (mec_count, pbp_count, contributing features, has vancomycin signals)
+    """
+    return (
+        len(mec_a_mutations),
+        len(pbp2a_mutations),
+        _mutation_contrib(mec_a_mutations, pbp2a_mutations, _MECA_WEIGHTS, _PBP2A_WEIGHTS),
+        bool(_VAN_RE.search(vancomycin_resistance_profile or ''))
+    )
+
+
+def _probability_chart(oxa: float, van: float, cef: float) -> Dict[str, Any]:
+    """Build the per-antibiotic probability chart."""
+    return {
+        'title': 'Resistance Probabilities',
+        'data': [
+            {'name': 'Oxacillin', 'value': oxa},
+            {'name': 'Vancomycin', 'value': van},
+            {'name': 'Ceftaroline', 'value': cef}
+        ]
+    }
+
+
+def _bayesian_confidence(oxa: float, van: float, cef: float, mutation_count: int) -> float:
+    """Calibrate confidence from the mean probability and the mutation burden."""
+    return min(0.95, max(0.55, 0.6 + ((oxa + van + cef) / 3) * 0.25 + min(6, mutation_count) * 0.02))
+
+
+def _finalize_bayesian(
+    result: Dict[str, Any],
+    prepared: Tuple[int, int, List[Dict[str, Any]], bool]
 ) -> Dict[str, Any]:
-    """Fallback heuristic for Bayesian prediction."""
-    mec_count = len(mec_a_mutations)
-    pbp_count = len(pbp2a_mutations)
-    has_van_signals = bool(re.search(r'van|thicken|cell\s*wall', (vancomycin_resistance_profile or '').lower()))
+    """Post-process a raw Bayesian model response into the API result shape."""
+    mec_count, pbp_count, contrib, _ = prepared
+    oxa = float(result.get('oxacillinResistanceProbability', 0))
+    van = float(result.get('vancomycinResistanceProbability', 0))
+    cef = float(result.get('ceftarolineResistanceProbability', 0))
+    
+    # Ensure charts exist
+    if not result.get('charts') or not isinstance(result['charts'], list) or len(result['charts']) == 0:
+        result['charts'] = [_probability_chart(oxa, van, cef)]
+    
+    # Calculate confidence
+    confidence = _bayesian_confidence(oxa, van, cef, mec_count + pbp_count)
+    
+    # Threat level
+    max_prob = max(oxa, van, cef)
+    threat_level = _threat(max_prob)
+    
+    breakdown = '\n\n'.join([
+        f'Input summary: {mec_count} mecA mutation(s), {pbp_count} PBP2a mutation(s).',
+        f'Probabilities estimated: Oxacillin {oxa * 100:.1f}%, Vancomycin {van * 100:.1f}%, Ceftaroline {cef * 100:.1f}%.',
+        f'Threat level: {threat_level} (based on the highest probability).',
+        f'Confidence: {confidence * 100:.1f}% — calibrated from model outputs and input mutation burden.',
+        f'Rationale: {result.get("rationale", "")}'
+    ])
+    
+    result['oxacillinResistanceProbability'] = oxa
+    result['contributingFeatures'] = contrib
+    result['threatLevel'] = threat_level
+    result['breakdownAnalysis'] = breakdown
+    result['charts'] = result['charts'][:1]
+    result['confidenceLevel'] = confidence
     
+    if not result.get('rationale') or not result['rationale'].strip():
+        result['rationale'] = (
+            'This analysis is probabilistic and observational. Oxacillin resistance is strongly linked to mecA presence. '
+            'Vancomycin probabilities remain low without explicit mechanisms; ceftaroline probabilities reflect mutation burden.'
+        )
+    
+    return result
+
+
+def _heuristic_probabilities(prepared: Tuple[int, int, List[Dict[str, Any]], bool]) -> Tuple[float, float, float]:
+    """Heuristic (oxacillin, vancomycin, ceftaroline) probabilities from mutation counts."""
+    mec_count, pbp_count, _, has_van_signals = prepared
     # Oxacillin strongly associated with mecA
     oxa_prob = min(0.95, 0.4 + mec_count * 0.12 + pbp_count * 0.08)
     van_prob = 0.22 if has_van_signals else 0.1
     cef_prob = min(0.25 + (mec_count + pbp_count) * 0.08, 0.85)
-    conf = min(0.95, max(0.55, 0.6 + ((oxa_prob + van_prob + cef_prob) / 3) * 0.25 + min(6, mec_count + pbp_count) * 0.02))
+    return oxa_prob, van_prob, cef_prob
+
+
+# Heuristic confidence at which the model call is skipped (see _draft_is_confident)
+_DRAFT_CONFIDENCE = 0.85
+
+
+@functools.lru_cache(maxsize=1)
+def _known_mutation_names(dataset_version: int) -> Tuple[frozenset, frozenset]:
+    """Canonical names of the known CARD mecA and PBP2a mutations."""
+    dataset_manager = get_dataset_manager()
+    return tuple(
+        frozenset(_canon(m['mutation']) for m in dataset_manager.get_known_mutations(gene) if m['mutation'])
+        for gene in ('mecA', 'PBP2a')
+    )
+
+
+def _current_known_mutation_names() -> Tuple[frozenset, frozenset]:
+    """_known_mutation_names for the current dataset version (stats the file; run off the event loop)."""
+    return _known_mutation_names(get_dataset_manager().get_dataset_version())
+
+
+async def _draft_is_confident(
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    prepared: Tuple[int, int, List[Dict[str, Any]], bool],
+    profiles: Tuple[Optional[str], ...] = ()
+) -> bool:
+    """
+    Check whether the heuristic estimate can be returned without asking the model.
     
-    contrib = [
-        *[{'name': f'mecA:{m}', 'weight': min(1, 0.45 + i * 0.06)} for i, m in enumerate(mec_a_mutations[:6])],
-        *[{'name': f'PBP2a:{m}', 'weight': min(1, 0.4 + i * 0.06)} for i, m in enumerate(pbp2a_mutations[:6])]
-    ]
+    Never true when any free-text resistance profile is given, since the
+    heuristic cannot take it into account. The cheap checks run first; the
+    dataset lookup only happens for confident drafts, in a worker thread.
+    """
+    if any(profile and profile.strip() for profile in profiles):
+        return False
+    mec_count, pbp_count, _, _ = prepared
+    if _bayesian_confidence(*_heuristic_probabilities(prepared), mec_count + pbp_count) < _DRAFT_CONFIDENCE:
+        return False
+    known_mecA, known_pbp2a = await asyncio.to_thread(_current_known_mutation_names)
+    return known_mecA.issuperset(map(_canon, mec_a_mutations)) and known_pbp2a.issuperset(map(_canon, pbp2a_mutations))
+
+
+def _bayesian_fallback(prepared: Tuple[int, int, List[Dict[str, Any]], bool], draft: bool = False) -> Dict[str, Any]:
+    """
+    Fallback heuristic for Bayesian prediction (takes _prepare_bayesian output).
     
-    threat_level = 'High' if max(oxa_prob, van_prob, cef_prob) >= 0.75 else 'Moderate' if max(oxa_prob, van_prob, cef_prob) >= 0.5 else 'Low' if max(oxa_prob, van_prob, cef_prob) >= 0.25 else 'Very Low'
+    With draft=True the result is labelled as a confident draft returned
+    without a model call rather than as a fallback after a failed one.
+    """
+    mec_count, pbp_count, contrib, _ = prepared
+    oxa_prob, van_prob, cef_prob = _heuristic_probabilities(prepared)
+    conf = _bayesian_confidence(oxa_prob, van_prob, cef_prob, mec_count + pbp_count)
     
-    breakdown = (
-        f'Input summary: {mec_count} mecA mutation(s), {pbp_count} PBP2a mutation(s).\n\n'
-        f'Probabilities estimated: Oxacillin {oxa_prob * 100:.1f}%, Vancomycin {van_prob * 100:.1f}%, Ceftaroline {cef_prob * 100:.1f}%.\n\n'
-        f'Threat level: {threat_level}.\n\n'
-        f'Confidence: {conf * 100:.1f}% — heuristic fallback estimate.'
-    )
+    threat_level = _threat(max(oxa_prob, van_prob, cef_prob))
+    
+    breakdown = '\n\n'.join([
+        f'Input summary: {mec_count} mecA mutation(s), {pbp_count} PBP2a mutation(s).',
+        f'Probabilities estimated: Oxacillin {oxa_prob * 100:.1f}%, Vancomycin {van_prob * 100:.1f}%, Ceftaroline {cef_prob * 100:.1f}%.',
+        f'Threat level: {threat_level}.',
+        f'Confidence: {conf * 100:.1f}% — ' + (
+            'heuristic draft estimate (known mutations only; model not consulted).' if draft
+            else 'heuristic fallback estimate.'
+        )
+    ])
     
     return {
         'oxacillinResistanceProbability': oxa_prob,
         'vancomycinResistanceProbability': van_prob,
         'ceftarolineResistanceProbability': cef_prob,
         'rationale': (
-            'Fallback heuristic estimates probabilities from mutation counts. '
+            ('Draft' if draft else 'Fallback') + ' heuristic estimates probabilities from mutation counts. '
             'Oxacillin resistance strongly correlates with mecA presence. '
             'Vancomycin remains low without explicit mechanisms; ceftaroline increases with PBP2a/mecA mutation burden.'
         ),
@@ -196,14 +870,7 @@ def _bayesian_fallback(
             '3. Investigate structural impacts via in-silico modeling. '
             '4. Establish conservative alerting thresholds.'
         ),
-        'charts': [{
-            'title': 'Resistance Probabilities',
-            'data': [
-                {'name': 'Oxacillin', 'value': oxa_prob},
-                {'name': 'Vancomycin', 'value': van_prob},
-                {'name': 'Ceftaroline', 'value': cef_prob}
-            ]
-        }],
+        'charts': [_probability_chart(oxa_prob, van_prob, cef_prob)],
         'contributingFeatures': contrib,
         'threatLevel': threat_level,
         'breakdownAnalysis': breakdown,
@@ -237,21 +904,26 @@ async def predict_resistance_ml(
         raise ValueError('Please provide at least one mecA or PBP2a mutation.')
     
     # Select model
-    if model_type == "svm":
-        model = get_svm_model()
-    elif model_type == "random_forest":
-        model = get_rf_model()
-    else:
-        model = get_ensemble_model()
-    
-    # Get predictions
-    result = model.predict(
-        mec_a_mutations=mec_a_mutations,
-        pbp2a_mutations=pbp2a_mutations,
-        sccmec_type=sccmec_type,
-        additional_genes=additional_genes
+    model = _MODELS.get(model_type, _ensemble)()
+    
+    # Get predictions (batched with concurrent requests)
+    result = await _model_batcher.predict(
+        model,
+        mec_a_mutations,
+        pbp2a_mutations,
+        sccmec_type,
+        additional_genes
     )
     
+    return _ml_card(result, mec_a_mutations, pbp2a_mutations, sccmec_type)
+
+def _ml_card(
+    result: Dict[str, Any],
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    sccmec_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the ML prediction result from a model's raw predict() output."""
     predictions = result['predictions']
     
     # Calculate threat level
@@ -260,7 +932,7 @@ async def predict_resistance_ml(
         predictions['vancomycin']['probability'],
         predictions['ceftaroline']['probability']
     )
-    threat_level = 'High' if max_prob >= 0.75 else 'Moderate' if max_prob >= 0.5 else 'Low' if max_prob >= 0.25 else 'Very Low'
+    threat_level = _threat(max_prob)
     
     # Build charts
     charts = [
@@ -283,14 +955,14 @@ async def predict_resistance_ml(
         })
     
     # Contributing features
-    contrib = []
-    for i, m in enumerate(mec_a_mutations[:4]):
-        contrib.append({'name': f'mecA:{m}', 'weight': min(1, 0.5 + i * 0.05)})
-    for i, m in enumerate(pbp2a_mutations[:4]):
-        contrib.append({'name': f'PBP2a:{m}', 'weight': min(1, 0.45 + i * 0.05)})
+    contrib = _mutation_contrib(mec_a_mutations, pbp2a_mutations, _MECA_WEIGHTS_ML, _PBP2A_WEIGHTS_ML)
     
     # Confidence from model
-    avg_confidence = sum(p['confidence'] for p in predictions.values()) / 3
+    avg_confidence = (
+        predictions['oxacillin']['confidence']
+        + predictions['vancomycin']['confidence']
+        + predictions['ceftaroline']['confidence']
+    ) / 3.0
     
     # Build breakdown
     breakdown = (
@@ -347,24 +1019,126 @@ async def predict_resistance_emergence(
     Returns:
         Prediction result with analysis and charts
     """
-    system = [
-        'You are an AI systems engineer and computational biology reviewer optimizing an Evolutionary Antibiotic Resistance Predictor for MRSA. Outputs must meet ISEF judging standards with rigorous, cautious, publication-style language.',
-        '',
-        'Required content guidelines:',
-        '- Mutation Pattern Analysis: list specific mutations using standard notation (e.g., mecA(G246E), PBP2a(V311A)). Classify each as Structural, Regulatory, or Accessory/virulence-associated. Include both relative contribution scores (normalized 0–1) and co-occurrence frequency across isolates.',
-        '- Existing Biological Knowledge Integration: explicitly distinguish literature-supported associations from model-inferred/heuristic signals. State mechanisms conservatively: altered β-lactam binding, cell wall thickening, etc.',
-        '- Evolutionary Trajectory Modeling: represent resistance emergence stepwise (e.g., mecA acquisition → PBP2a structural mutation → regulatory adaptation → phenotypic shift) and reference selection pressure (β-lactam or glycopeptide exposure).',
-        '- Scientific Rigor: include explicit disclaimer that results are probabilistic, observational, non-diagnostic. No treatment guidance.',
-        '- Visualization: produce charts that map directly to text with clear labels: "Relative Contribution Score" and "Co-occurrence Frequency Across Isolates". Values must be in [0,1].',
-        '- Interventions: suggest research actions only (genomic surveillance, temporal tracking, phenotypic validation assays, literature cross-validation).',
-        '',
-        'Return a JSON object strictly matching keys:',
-        '{"resistancePrediction": string, "confidenceLevel": number, "inDepthExplanation": string, "suggestedInterventions": string, "charts": [{"title": string, "data": [{"name": string, "value": number}]}]}',
+    system, user, mutations = _build_emergence_prompt(mutation_patterns, evolutionary_trajectories, existing_knowledge)
+    
+    try:
+        result = await coalesced_generate_json(
+            system=system,
+            user=user,
+            temperature=0.2,
+            response_format=_EMERGENCE_RESPONSE_FORMAT,
+            cache_key=(_mutation_key(mutations), evolutionary_trajectories, existing_knowledge)
+        )
+        return _finalize_emergence(result, mutations)
+    except _LLM_ERRORS:
+        # Fallback once retries are exhausted
+        return FallbackResult(_evolutionary_fallback(mutations))
+
+
+async def predict_resistance_emergence_batch(
+    inputs: List[Dict[str, Any]],
+    max_concurrency: int = 32
+) -> List[Dict[str, Any]]:
+    """
+    Run emergence predictions for many inputs concurrently within rate limits.
+    
+    Args:
+        inputs: List of dicts with the keyword arguments of
+            predict_resistance_emergence (mutation_patterns, evolutionary_trajectories, ...)
+        max_concurrency: Maximum requests in flight
+    
+    Returns:
+        One prediction result per input, in input order
+    """
+    items = []
+    mutation_lists = []
+    for item in inputs:
+        system, user, mutations = _build_emergence_prompt(
+            item['mutation_patterns'],
+            item.get('evolutionary_trajectories') or '',
+            item.get('existing_knowledge')
+        )
+        mutation_lists.append(mutations)
+        items.append({
+            'system': system,
+            'user': user,
+            'temperature': 0.2,
+            'response_format': _EMERGENCE_RESPONSE_FORMAT
+        })
+    
+    raw_results = await gather_generate_json(items, max_concurrency=max_concurrency)
+    
+    results = []
+    for mutations, raw in zip(mutation_lists, raw_results):
+        try:
+            if raw is None:
+                raise ValueError('No output for this input')
+            results.append(_finalize_emergence(raw, mutations))
+        except _LLM_ERRORS:
+            results.append(FallbackResult(_evolutionary_fallback(mutations)))
+    return results
+
+
+async def predict_resistance_emergence_marshaled(
+    inputs: List[Dict[str, Any]],
+    batch_size: int = 16
+) -> List[Dict[str, Any]]:
+    """
+    Run emergence predictions for many inputs, several inputs per API call.
+    
+    Args:
+        inputs: List of dicts with the keyword arguments of
+            predict_resistance_emergence (mutation_patterns, evolutionary_trajectories, ...)
+        batch_size: Maximum number of inputs per API call
+    
+    Returns:
+        One prediction result per input, in input order
+    """
+    if not inputs:
+        return []
+    
+    prompts = [
+        _build_emergence_prompt(
+            item['mutation_patterns'],
+            item.get('evolutionary_trajectories') or '',
+            item.get('existing_knowledge')
+        )
+        for item in inputs
     ]
     
+    raw_results = await _generate_marshaled(
+        system=prompts[0][0],
+        users=[user for _, user, _ in prompts],
+        batch_size=batch_size,
+        temperature=0.2
+    )
+    
+    results = []
+    for (_, _, mutations), raw in zip(prompts, raw_results):
+        try:
+            if raw is None:
+                raise ValueError('No marshaled output for this input')
+            results.append(_finalize_emergence(raw, mutations))
+        except _LLM_ERRORS:
+            results.append(FallbackResult(_evolutionary_fallback(mutations)))
+    return results
+
+
+def _build_emergence_prompt(
+    mutation_patterns: str,
+    evolutionary_trajectories: str,
+    existing_knowledge: Optional[str] = None
+) -> Tuple[str, str, List[str]]:
+    """
+    Validate the input and build the prompt pair for an emergence prediction.
+    
+    Returns:
+        (system, user, mutation tokens); the tokens are reused for the charts
+        and contributing features so the patterns are only parsed once
+    """
     # Validation
-    mutation_tokens = [s.strip() for s in re.split(r'[\n,;]+', mutation_patterns) if s.strip()]
-    plausible_token = next((t for t in mutation_tokens if re.search(r'[A-Za-z0-9_\-]+\(.+\)', t)), None)
+    mutation_tokens = [t for t in map(str.strip, _TOKEN_SPLIT_RE.split(mutation_patterns)) if t]
+    plausible_token = next(filter(_looks_like_mutation, mutation_tokens), None)
     
     if not mutation_tokens or not plausible_token:
         raise ValueError(
@@ -378,119 +1152,105 @@ async def predict_resistance_emergence(
         f'Existing Knowledge: {existing_knowledge or ""}'
     )
     
-    try:
-        result = await generate_json(
-            system='\n'.join(system),
-            user=user,
-            temperature=0.7
-        )
-        
-        mutations = [s.strip() for s in re.split(r'[\n,]', mutation_patterns) if s.strip()]
-        
-        # Ensure charts exist
-        if not result.get('charts') or not isinstance(result['charts'], list) or len(result['charts']) == 0:
-            chart1 = {
-                'title': 'Relative Contribution Score',
-                'data': [
-                    {'name': m if m else f'mutation_{i+1}', 'value': max(0, min(1, 0.5 + i * 0.1))}
-                    for i, m in enumerate((mutations[:6] if mutations else ['signal']))
-                ]
-            }
-            chart2 = {
-                'title': 'Co-occurrence Frequency Across Isolates',
-                'data': [
-                    {'name': m if m else f'feature_{i+1}', 'value': max(0, min(1, 0.3 + i * 0.08))}
-                    for i, m in enumerate((mutations[:6] if mutations else ['feature']))
-                ]
-            }
-            result['charts'] = [chart1, chart2]
-        
-        # Contributing features
-        contrib = []
-        if result.get('charts') and len(result['charts']) > 0 and isinstance(result['charts'][0].get('data'), list):
-            for d in result['charts'][0]['data'][:6]:
-                contrib.append({'name': str(d['name']), 'weight': float(d['value'])})
-        
-        if not contrib:
-            for i, m in enumerate(mutations[:6]):
-                contrib.append({'name': m if m else f'mutation_{i+1}', 'weight': max(0, min(1, 0.5 + i * 0.08))})
-        
-        # Confidence
-        model_conf = result.get('confidenceLevel')
-        base_confidence = min(0.95, max(0.55, 0.55 + min(6, len(mutations)) * 0.06))
-        confidence = min(0.95, max(base_confidence, float(model_conf))) if isinstance(model_conf, (int, float)) else base_confidence
-        result['confidenceLevel'] = confidence
-        
-        # Threat level
-        avg_weight = sum(c['weight'] for c in contrib) / len(contrib) if contrib else 0
-        threat_level = 'High' if avg_weight >= 0.75 else 'Moderate' if avg_weight >= 0.5 else 'Low' if avg_weight >= 0.25 else 'Very Low'
-        
-        # Breakdown
-        contrib_str = ", ".join(f"{c['name']} ({int(c['weight'] * 100)}%)" for c in contrib)
-        breakdown_lines = [
-            f'Detected {len(mutations)} mutation token(s): {", ".join(mutations)}.',
-            f'Top contributing features: {contrib_str}.',
-            f'Threat level: {threat_level}.',
-            f'Confidence: {confidence * 100:.1f}% — this is an aggregated, calibrated score blending model output with input signal strength.',
-            f'How the AI derived this result: {result.get("inDepthExplanation", "")}'
-        ]
-        
-        if not result.get('inDepthExplanation') or not result['inDepthExplanation'].strip():
-            result['inDepthExplanation'] = (
-                'Evolutionary Trajectory Explanation: mecA acquisition → PBP2a structural mutation → '
-                'regulatory adaptation → phenotypic resistance shift (under β-lactam/glycopeptide selection pressure).\n\n'
-                'Existing Knowledge vs Model Inference: literature-supported associations include altered β-lactam binding '
-                'via PBP2a mutations; model-inferred signals reflect heuristic interpretation of co-occurring variants and '
-                'observed trajectories.\n\n'
-                'Scientific Disclaimer: results are probabilistic, observational, and not diagnostic. No clinical recommendations.'
-            )
-        
-        result['contributingFeatures'] = contrib
-        result['threatLevel'] = threat_level
-        result['breakdownAnalysis'] = '\n\n'.join(breakdown_lines)
-        
-        return result
-    except Exception:
-        # Fallback
-        return _evolutionary_fallback(mutation_patterns)
+    return _EMERGENCE_SYSTEM, user, mutation_tokens
 
 
-def _evolutionary_fallback(mutation_patterns: str) -> Dict[str, Any]:
-    """Fallback for evolutionary prediction."""
-    mutations = [s.strip() for s in re.split(r'[,\n]', mutation_patterns) if s.strip()]
-    base_confidence = min(0.95, max(0.55, 0.55 + min(6, len(mutations)) * 0.06))
-    
-    chart1 = {
-        'title': 'Relative Contribution Score',
-        'data': [
-            {'name': m if m else f'mutation_{i+1}', 'value': max(0, min(1, 0.5 + i * 0.1))}
-            for i, m in enumerate((mutations[:6] if mutations else ['signal']))
-        ]
-    }
-    chart2 = {
-        'title': 'Co-occurrence Frequency Across Isolates',
-        'data': [
-            {'name': m if m else f'feature_{i+1}', 'value': max(0, min(1, 0.3 + i * 0.08))}
-            for i, m in enumerate((mutations[:6] if mutations else ['feature']))
+def _emergence_charts(mutations: List[str]) -> List[Dict[str, Any]]:
+    """Build the heuristic contribution/co-occurrence charts in one pass."""
+    if not mutations:
+        return [
+            {'title': 'Relative Contribution Score', 'data': [{'name': 'signal', 'value': _CONTRIBUTION_SCORES[0]}]},
+            {'title': 'Co-occurrence Frequency Across Isolates', 'data': [{'name': 'feature', 'value': _COOCCURRENCE_SCORES[0]}]}
         ]
-    }
     
-    contrib = [
-        {'name': m if m else f'mutation_{i+1}', 'weight': max(0, min(1, 0.5 + i * 0.08))}
-        for i, m in enumerate(mutations[:6])
+    contribution = []
+    cooccurrence = []
+    for m, contribution_score, cooccurrence_score in zip(mutations, _CONTRIBUTION_SCORES, _COOCCURRENCE_SCORES):
+        contribution.append({'name': m, 'value': contribution_score})
+        cooccurrence.append({'name': m, 'value': cooccurrence_score})
+    return [
+        {'title': 'Relative Contribution Score', 'data': contribution},
+        {'title': 'Co-occurrence Frequency Across Isolates', 'data': cooccurrence}
     ]
+
+
+def _finalize_emergence(result: Dict[str, Any], mutations: List[str]) -> Dict[str, Any]:
+    """Post-process a raw emergence model response into the API result shape."""
+    # Ensure charts exist
+    if not result.get('charts') or not isinstance(result['charts'], list) or len(result['charts']) == 0:
+        result['charts'] = _emergence_charts(mutations)
+    
+    # Contributing features
+    contrib = []
+    if result.get('charts') and len(result['charts']) > 0 and isinstance(result['charts'][0].get('data'), list):
+        contrib = [{'name': str(d['name']), 'weight': float(d['value'])} for d in result['charts'][0]['data'][:6]]
+    
+    if contrib:
+        avg_weight = fmean(c['weight'] for c in contrib)
+    else:
+        contrib = [{'name': m, 'weight': w} for m, w in zip(mutations, _EMERGENCE_WEIGHTS)]
+        avg_weight = _EMERGENCE_MEAN_WEIGHTS[len(contrib)]
+    
+    # Confidence
+    model_conf = result.get('confidenceLevel')
+    base_confidence = _EMERGENCE_BASE_CONFIDENCE[min(6, len(mutations))]
+    confidence = min(0.95, max(base_confidence, float(model_conf))) if isinstance(model_conf, (int, float)) else base_confidence
+    result['confidenceLevel'] = confidence
     
-    avg_weight = sum(c['weight'] for c in contrib) / len(contrib) if contrib else 0
-    threat_level = 'High' if avg_weight >= 0.75 else 'Moderate' if avg_weight >= 0.5 else 'Low' if avg_weight >= 0.25 else 'Very Low'
+    # Threat level
+    threat_level = _threat(avg_weight)
     
+    # Breakdown
+    breakdown = _emergence_breakdown(
+        mutations,
+        contrib,
+        threat_level,
+        f'Confidence: {confidence * 100:.1f}% — this is an aggregated, calibrated score blending model output with input signal strength.',
+        f'How the AI derived this result: {result.get("inDepthExplanation", "")}'
+    )
+    
+    if not result.get('inDepthExplanation') or not result['inDepthExplanation'].strip():
+        result['inDepthExplanation'] = _EMERGENCE_DEFAULT_EXPLANATION
+    
+    result['contributingFeatures'] = contrib
+    result['threatLevel'] = threat_level
+    result['breakdownAnalysis'] = breakdown
+    
+    return result
+
+
+def _emergence_breakdown(
+    mutations: List[str],
+    contrib: List[Dict[str, Any]],
+    threat_level: str,
+    confidence_line: str,
+    explanation_line: str
+) -> str:
+    """Join the emergence breakdown paragraphs shared by the model and fallback paths."""
     contrib_str = ", ".join(f"{c['name']} ({int(c['weight'] * 100)}%)" for c in contrib)
-    breakdown = [
+    return '\n\n'.join([
         f'Detected {len(mutations)} mutation token(s): {", ".join(mutations)}.',
         f'Top contributing features: {contrib_str}.',
         f'Threat level: {threat_level}.',
+        confidence_line,
+        explanation_line
+    ])
+
+
+def _evolutionary_fallback(mutations: List[str]) -> Dict[str, Any]:
+    """Fallback for evolutionary prediction (takes the parsed mutation tokens)."""
+    base_confidence = _EMERGENCE_BASE_CONFIDENCE[min(6, len(mutations))]
+    
+    contrib = [{'name': m, 'weight': w} for m, w in zip(mutations, _EMERGENCE_WEIGHTS)]
+    threat_level = _threat(_EMERGENCE_MEAN_WEIGHTS[len(contrib)])
+    
+    breakdown = _emergence_breakdown(
+        mutations,
+        contrib,
+        threat_level,
         f'Confidence: {base_confidence * 100:.1f}% — heuristic fallback estimate.',
         'Explanation: Evolutionary trajectory heuristics applied; see detailed output for charts and suggested interventions.'
-    ]
+    )
     
     return {
         'resistancePrediction': (
@@ -498,21 +1258,14 @@ def _evolutionary_fallback(mutation_patterns: str) -> Dict[str, Any]:
             'trajectories (probabilistic, not definitive).'
         ),
         'confidenceLevel': base_confidence,
-        'inDepthExplanation': (
-            'Evolutionary Trajectory Explanation: mecA acquisition → PBP2a structural mutation → '
-            'regulatory adaptation → phenotypic resistance shift (under β-lactam/glycopeptide selection pressure).\n\n'
-            'Existing Knowledge vs Model Inference: literature-supported associations include altered β-lactam binding '
-            'via PBP2a mutations; model-inferred signals reflect heuristic interpretation of co-occurring variants and '
-            'observed trajectories.\n\n'
-            'Scientific Disclaimer: results are probabilistic, observational, and not diagnostic. No clinical recommendations.'
-        ),
+        'inDepthExplanation': _EMERGENCE_DEFAULT_EXPLANATION,
         'suggestedInterventions': (
             'Genomic surveillance; temporal mutation tracking; phenotypic validation assays; literature cross-validation.'
         ),
-        'charts': [chart1, chart2],
+        'charts': _emergence_charts(mutations),
         'contributingFeatures': contrib,
         'threatLevel': threat_level,
-        'breakdownAnalysis': '\n\n'.join(breakdown)
+        'breakdownAnalysis': breakdown
     }
 
 
@@ -546,43 +1299,33 @@ async def predict_oxacillin_resistance(
         raise ValueError('Please provide at least one mecA or PBP2a mutation for oxacillin resistance prediction.')
     
     # Get ML predictions
-    ensemble = get_ensemble_model()
-    ml_result = ensemble.predict(
-        mec_a_mutations=mec_a_mutations,
-        pbp2a_mutations=pbp2a_mutations,
-        sccmec_type=sccmec_type,
-        additional_genes=additional_genes
-    )
-    
+    ml_result = await _run_ensemble(mec_a_mutations, pbp2a_mutations, sccmec_type, additional_genes)
+    return _oxacillin_card(ml_result, mec_a_mutations, pbp2a_mutations, sccmec_type, strain_info)
+
+
+def _oxacillin_card(
+    ml_result: Dict[str, Any],
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    sccmec_type: Optional[str] = None,
+    strain_info: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the oxacillin prediction result from an ensemble predict() output."""
     oxa_prediction = ml_result['predictions']['oxacillin']
     
     # High-risk mutations for oxacillin
-    high_risk_mecA = {'G246E', 'I112V', 'D223N', 'E125K'}
-    high_risk_pbp2a = {'E447K', 'V311A', 'N246D', 'A389T'}
-    
-    detected_high_risk = []
-    for m in mec_a_mutations:
-        if m in high_risk_mecA:
-            detected_high_risk.append(f'mecA({m})')
-    for m in pbp2a_mutations:
-        if m in high_risk_pbp2a:
-            detected_high_risk.append(f'PBP2a({m})')
+    detected_high_risk = (
+        [f'mecA({m})' for m in mec_a_mutations if m in _HIGH_RISK_MECA]
+        + [f'PBP2a({m})' for m in pbp2a_mutations if m in _HIGH_RISK_PBP2A]
+    )
     
     # SCCmec type analysis
     sccmec_analysis = ""
     sccmec_risk = 0.5
     if sccmec_type:
-        sccmec_risks = {
-            'I': (0.6, 'HA-MRSA associated, moderate resistance'),
-            'II': (0.8, 'HA-MRSA, high resistance, common in healthcare settings'),
-            'III': (0.85, 'HA-MRSA, high resistance, large cassette'),
-            'IV': (0.7, 'CA-MRSA associated (USA300), moderate-high resistance'),
-            'IVa': (0.72, 'CA-MRSA variant'),
-            'V': (0.75, 'CA-MRSA, moderate-high resistance'),
-        }
         sccmec_clean = sccmec_type.replace('type-', '').replace('type', '').strip().upper()
-        if sccmec_clean in sccmec_risks:
-            sccmec_risk, sccmec_analysis = sccmec_risks[sccmec_clean]
+        if sccmec_clean in _SCCMEC_RISKS:
+            sccmec_risk, sccmec_analysis = _SCCMEC_RISKS[sccmec_clean]
         else:
             sccmec_analysis = f'SCCmec type {sccmec_type} detected'
     
@@ -592,7 +1335,7 @@ async def predict_oxacillin_resistance(
         adjusted_prob = min(0.98, adjusted_prob * 0.7 + sccmec_risk * 0.3)
     
     # Threat level
-    threat_level = 'High' if adjusted_prob >= 0.75 else 'Moderate' if adjusted_prob >= 0.5 else 'Low' if adjusted_prob >= 0.25 else 'Very Low'
+    threat_level = _threat(adjusted_prob)
     
     # Build detailed analysis
     analysis_points = [
@@ -645,13 +1388,10 @@ async def predict_oxacillin_resistance(
     ]
     
     # Contributing features
-    contrib = []
-    for i, m in enumerate(mec_a_mutations[:4]):
-        weight = 0.6 if m in high_risk_mecA else 0.4
-        contrib.append({'name': f'mecA:{m}', 'weight': weight})
-    for i, m in enumerate(pbp2a_mutations[:4]):
-        weight = 0.55 if m in high_risk_pbp2a else 0.35
-        contrib.append({'name': f'PBP2a:{m}', 'weight': weight})
+    contrib = (
+        [{'name': f'mecA:{m}', 'weight': 0.6 if m in _HIGH_RISK_MECA else 0.4} for m in mec_a_mutations[:4]]
+        + [{'name': f'PBP2a:{m}', 'weight': 0.55 if m in _HIGH_RISK_PBP2A else 0.35} for m in pbp2a_mutations[:4]]
+    )
     if sccmec_type:
         contrib.append({'name': f'SCCmec:{sccmec_type}', 'weight': sccmec_risk})
     
@@ -681,3 +1421,19 @@ async def predict_oxacillin_resistance(
             '4. Monitor for additional resistance development.'
         )
     }
+
+
+async def _run_ensemble(
+    mec_a_mutations: List[str],
+    pbp2a_mutations: List[str],
+    sccmec_type: Optional[str] = None,
+    additional_genes: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Run the ensemble model (memoized per mutation profile, batched across requests)."""
+    return await _model_batcher.predict(
+        _ensemble(),
+        mec_a_mutations,
+        pbp2a_mutations,
+        sccmec_type,
+        additional_genes
+    )
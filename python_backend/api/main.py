@@ -1,26 +1,273 @@
 """FastAPI backend for MRSA Resistance Forecaster."""
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
 import asyncio
-
-import sys
+import functools
+import gzip
+import hashlib
+import json
+import logging
 import os
+import sys
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import AnyHttpUrl, BaseModel, TypeAdapter, ValidationError
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+
+# orjson is optional; serialize responses with it when available
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from db.sqlite_db import get_db
-from ai.predictions import (
-    predict_resistance_bayesian,
-    predict_resistance_emergence,
-    predict_resistance_ml,
-    predict_oxacillin_resistance
-)
+def _dumps_line(obj: Any) -> bytes:
+    return _dumps(obj) + b'\n'
+
+
+# Make python_backend importable when this file is run directly
+# (e.g. start_complete.sh); uvicorn "api.main:app" already has it on the path
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+from db.sqlite_db import get_db, get_prediction_writer
 from api.scrape_data import router as scrape_router
+from api.prediction_jobs import PredictionJobQueue
+from api.prediction_cache import PredictionCache
+from data.scrapers import get_dataset_manager
 
-app = FastAPI(title="MRSA Resistance Forecaster API")
+
+def _predictions():
+    """
+    Import the prediction module on first use.
+    
+    It pulls in scikit-learn and the OpenAI SDK, so importing it lazily lets
+    the server bind and answer /health before the models are loaded.
+    """
+    from ai import predictions
+    return predictions
+
+
+def _warm_up():
+    """Import the prediction stack and load the ML models (run in a worker thread)."""
+    _predictions()
+    from ai.ml_models import get_ensemble_model
+    get_ensemble_model().load()
+
+
+# Prediction functions keyed by type, taking the request fields as a dict
+_PREDICTION_RUNNERS = {
+    'bayesian': lambda data: _predictions().predict_resistance_bayesian(
+        mec_a_mutations=data['mecAMutations'],
+        pbp2a_mutations=data['pbp2aMutations'],
+        vancomycin_resistance_profile=data.get('vancomycinResistanceProfile'),
+        ceftaroline_resistance_profile=data.get('ceftarolineResistanceProfile'),
+        oxacillin_resistance_profile=data.get('oxacillinResistanceProfile')
+    ),
+    'evolutionary': lambda data: _predictions().predict_resistance_emergence(
+        mutation_patterns=data['mutationPatterns'],
+        evolutionary_trajectories=data['evolutionaryTrajectories'],
+        existing_knowledge=data.get('existingKnowledge')
+    ),
+    'ml': lambda data: _predictions().predict_resistance_ml(
+        mec_a_mutations=data['mecAMutations'],
+        pbp2a_mutations=data['pbp2aMutations'],
+        model_type=data.get('modelType', 'ensemble'),
+        sccmec_type=data.get('sccmecType'),
+        additional_genes=data.get('additionalGenes')
+    ),
+    'oxacillin': lambda data: _predictions().predict_oxacillin_resistance(
+        mec_a_mutations=data['mecAMutations'],
+        pbp2a_mutations=data['pbp2aMutations'],
+        sccmec_type=data.get('sccmecType'),
+        additional_genes=data.get('additionalGenes'),
+        strain_info=data.get('strainInfo')
+    )
+}
+
+prediction_cache = PredictionCache(maxsize=4096, ttl=3600)
+
+
+def _canon_input(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Strip request strings and list items.
+    
+    The runner gets this same dict, so requests that share a cache entry
+    also get the same prediction. List order is kept, since the contributing
+    features and chart weights depend on mutation order.
+    """
+    return {
+        field: [item.strip() if isinstance(item, str) else item for item in value] if isinstance(value, list)
+        else value.strip() if isinstance(value, str)
+        else value
+        for field, value in data.items()
+    }
+
+
+def _canon_key(prediction_type: str, canonical: Dict[str, Any]) -> bytes:
+    """
+    Hash a normalised prediction request (see _canon_input) for the response cache.
+    
+    The dataset version and file mtime are included so a rescrape (in this
+    process or another) starts a fresh set of entries.
+    """
+    manager = get_dataset_manager()
+    try:
+        db_mtime = os.stat(manager.db_path).st_mtime_ns
+    except OSError:
+        db_mtime = None
+    payload = json.dumps(
+        {'type': prediction_type, 'input': canonical, 'dataset': [manager.get_dataset_version(), db_mtime]},
+        sort_keys=True
+    )
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+async def _run_prediction(prediction_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a prediction, serving repeated requests from the response cache."""
+    runner = _PREDICTION_RUNNERS[prediction_type]
+    data = _canon_input(data)
+    if prediction_type == 'oxacillin' and data.get('strainInfo'):
+        # Free-text strain info makes these effectively unique
+        return await runner(data)
+    return await prediction_cache.get_or_compute(
+        _canon_key(prediction_type, data),
+        lambda: runner(data)
+    )
+
+
+# Webhooks must resolve to public addresses unless their host is listed in
+# WEBHOOK_ALLOWED_HOSTS (comma-separated, e.g. "localhost,hooks.internal")
+prediction_jobs = PredictionJobQueue(
+    {
+        prediction_type: functools.partial(_run_prediction, prediction_type)
+        for prediction_type in _PREDICTION_RUNNERS
+    },
+    allowed_hosts=os.getenv('WEBHOOK_ALLOWED_HOSTS', '').split(',')
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the prediction stack and models in the background and resume undelivered jobs;
+    flush writes and release shared clients on shutdown.
+    """
+    warmup = asyncio.create_task(asyncio.to_thread(_warm_up))
+    resumed = await prediction_jobs.resume()
+    if resumed:
+        print(f"Resumed {resumed} pending prediction job(s)")
+    yield
+    await prediction_jobs.aclose()
+    await get_prediction_writer().flush()
+    await asyncio.gather(warmup, return_exceptions=True)
+    # Only close the OpenAI client if something actually imported it
+    openai_client = sys.modules.get('ai.openai_client')
+    if openai_client is not None:
+        await openai_client.aclose()
+
+
+class _HealthCheckMiddleware:
+    """
+    Answer GET /health ahead of routing and the other middleware.
+    
+    Load balancer and k8s probes hit it constantly; the response is a fixed,
+    pre-encoded body.
+    """
+    
+    BODY = b'{"status":"ok"}'
+    HEADERS = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(BODY)).encode()),
+        (b'access-control-allow-origin', b'*')
+    ]
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == '/health' and scope['method'] in ('GET', 'HEAD'):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': self.HEADERS})
+            await send({'type': 'http.response.body', 'body': self.BODY if scope['method'] == 'GET' else b''})
+            return
+        await self.app(scope, receive, send)
+
+
+class _SkipHealthAccessLog(logging.Filter):
+    """Keep /health probes out of uvicorn's access log."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client, method, path, http_version, status)
+        return not (isinstance(record.args, tuple) and len(record.args) > 2 and record.args[2] == '/health')
+
+
+logging.getLogger('uvicorn.access').addFilter(_SkipHealthAccessLog())
+# Show scrape progress from data.scrapers; basicConfig is a no-op if logging is already set up
+logging.basicConfig(format='%(levelname)s:     %(message)s')
+logging.getLogger('data').setLevel(logging.INFO)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (gzip;q=0 refuses it)."""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, *params = (item.strip() for item in part.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+# Served by _StaticJSON, which picks its own precompressed variant and ETag
+_PRECOMPRESSED_PATHS = frozenset({'/', '/api/models'})
+
+
+class _GZipMiddleware(GZipMiddleware):
+    """
+    GZip responses for clients that accept it.
+    
+    Unlike Starlette's check, q-values are honoured (gzip;q=0 gets the plain
+    body). NDJSON streams, which must reach the client line by line, and the
+    precompressed _StaticJSON paths are passed through untouched.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or (
+            scope['path'].endswith('/stream')
+            or scope['path'] in _PRECOMPRESSED_PATHS
+            or not _accepts_gzip(Headers(scope=scope).get('accept-encoding', ''))
+        ):
+            await self.app(scope, receive, send)
+            return
+        # Starlette's own check would look for the substring "gzip" again
+        responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        await responder(scope, receive, send)
+
+
+app = FastAPI(
+    title="MRSA Resistance Forecaster API",
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
+)
 
 # Include data scraping routes
 app.include_router(scrape_router)
@@ -32,8 +279,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers reuse a preflight for a day instead of the default 10 minutes
+    max_age=86400,
 )
 
+# Compress larger responses (e.g. the prediction list); level 1 is cheap on CPU
+app.add_middleware(_GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Outermost, so health probes skip the stack above
+app.add_middleware(_HealthCheckMiddleware)
+
 
 # Request/Response models
 class BayesianPredictionRequest(BaseModel):
@@ -44,6 +299,10 @@ class BayesianPredictionRequest(BaseModel):
     oxacillinResistanceProfile: Optional[str] = None
 
 
+class BayesianBatchPredictionRequest(BaseModel):
+    inputs: List[BayesianPredictionRequest]
+
+
 class EvolutionaryPredictionRequest(BaseModel):
     mutationPatterns: str
     evolutionaryTrajectories: str
@@ -66,42 +325,94 @@ class OxacillinPredictionRequest(BaseModel):
     strainInfo: Optional[str] = None
 
 
+class BayesianAsyncPredictionRequest(BayesianPredictionRequest):
+    webhookEndpoint: str
+
+
+class EvolutionaryAsyncPredictionRequest(EvolutionaryPredictionRequest):
+    webhookEndpoint: str
+
+
+class MLAsyncPredictionRequest(MLPredictionRequest):
+    webhookEndpoint: str
+
+
+class OxacillinAsyncPredictionRequest(OxacillinPredictionRequest):
+    webhookEndpoint: str
+
+
+class AsyncPredictionResponse(BaseModel):
+    request_id: str
+
+
 class PredictionResponse(BaseModel):
     type: str
     input: Dict[str, Any]
     output: Dict[str, Any]
 
 
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {
-        "message": "MRSA Resistance Forecaster API",
-        "version": "2.0.0",
-        "endpoints": {
-            "health": "/health",
-            "api_docs": "/docs",
-            "predictions": {
-                "list": "GET /api/predictions",
-                "bayesian": "POST /api/predictions/bayesian",
-                "evolutionary": "POST /api/predictions/evolutionary",
-                "ml": "POST /api/predictions/ml",
-                "oxacillin": "POST /api/predictions/oxacillin"
-            },
-            "graphs": "GET /api/graphs/{graph_id}",
-            "data": {
-                "scrape": "POST /api/scrape-data",
-                "stats": "GET /api/dataset-stats"
-            }
+class _StaticJSON:
+    """A constant JSON payload, serialized and gzipped once and served with an ETag."""
+    
+    def __init__(self, payload: Dict[str, Any]):
+        body = _dumps(payload)
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        headers = {'Cache-Control': 'public, max-age=3600, immutable', 'Vary': 'Accept-Encoding'}
+        # (body, headers) per content coding; GZipMiddleware passes encoded bodies through
+        self._variants = {
+            'identity': (body, {**headers, 'ETag': f'"{etag}"'}),
+            'gzip': (gzip.compress(body, 9), {**headers, 'ETag': f'"{etag}-gzip"', 'Content-Encoding': 'gzip'})
+        }
+    
+    def response(self, request: Request) -> Response:
+        """Return the payload, or 304 if the client already has this version."""
+        coding = 'gzip' if _accepts_gzip(request.headers.get('accept-encoding', '')) else 'identity'
+        body, headers = self._variants[coding]
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and (
+            if_none_match.strip() == '*'
+            or headers['ETag'] in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+        ):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+
+_ROOT = _StaticJSON({
+    "message": "MRSA Resistance Forecaster API",
+    "version": "2.0.0",
+    "endpoints": {
+        "health": "/health",
+        "api_docs": "/docs",
+        "predictions": {
+            "list": "GET /api/predictions",
+            "bayesian": "POST /api/predictions/bayesian",
+            "bayesian_stream": "POST /api/predictions/bayesian/stream",
+            "evolutionary": "POST /api/predictions/evolutionary",
+            "ml": "POST /api/predictions/ml",
+            "oxacillin": "POST /api/predictions/oxacillin",
+            "async": "POST /api/predictions/{type}/async (result is POSTed to webhookEndpoint)"
         },
-        "models": {
-            "bayesian": "Bayesian Network Model with AI integration",
-            "evolutionary": "Evolutionary Resistance Predictor",
-            "svm": "Support Vector Machine classifier",
-            "random_forest": "Random Forest classifier",
-            "ensemble": "Ensemble (SVM + Random Forest)"
+        "graphs": "GET /api/graphs/{graph_id}",
+        "data": {
+            "scrape": "POST /api/scrape-data",
+            "scrape_status": "GET /api/scrape-data/status",
+            "stats": "GET /api/dataset-stats"
         }
+    },
+    "models": {
+        "bayesian": "Bayesian Network Model with AI integration",
+        "evolutionary": "Evolutionary Resistance Predictor",
+        "svm": "Support Vector Machine classifier",
+        "random_forest": "Random Forest classifier",
+        "ensemble": "Ensemble (SVM + Random Forest)"
     }
+})
+
+
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint."""
+    return _ROOT.response(request)
 
 
 @app.get("/health")
@@ -114,31 +425,19 @@ async def health_check():
 async def create_bayesian_prediction(request: BayesianPredictionRequest):
     """Create a Bayesian network prediction including oxacillin resistance."""
     try:
-        result = await predict_resistance_bayesian(
-            mec_a_mutations=request.mecAMutations,
-            pbp2a_mutations=request.pbp2aMutations,
-            vancomycin_resistance_profile=request.vancomycinResistanceProfile,
-            ceftaroline_resistance_profile=request.ceftarolineResistanceProfile,
-            oxacillin_resistance_profile=request.oxacillinResistanceProfile
-        )
+        payload = request.model_dump()
+        result = await _run_prediction('bayesian', payload)
         
         # Save to database
-        db = get_db()
-        prediction_id = db.add_prediction({
+        get_prediction_writer().enqueue({
             'type': 'bayesian',
-            'input': {
-                'mecAMutations': request.mecAMutations,
-                'pbp2aMutations': request.pbp2aMutations,
-                'vancomycinResistanceProfile': request.vancomycinResistanceProfile,
-                'ceftarolineResistanceProfile': request.ceftarolineResistanceProfile,
-                'oxacillinResistanceProfile': request.oxacillinResistanceProfile
-            },
+            'input': payload,
             'output': result
         })
         
         return PredictionResponse(
             type='bayesian',
-            input=request.dict(),
+            input=payload,
             output=result
         )
     except ValueError as e:
@@ -147,31 +446,65 @@ async def create_bayesian_prediction(request: BayesianPredictionRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@app.post("/api/predictions/bayesian/stream")
+async def stream_bayesian_predictions(request: BayesianBatchPredictionRequest):
+    """
+    Run Bayesian predictions for several isolates, streaming results as NDJSON.
+    
+    Each line is {"index": <input position>, "type": "bayesian", "input": ..., "output": ...}
+    and lines arrive in completion order, so fast isolates are not held back
+    by slow ones.
+    """
+    try:
+        results = _predictions().predict_resistance_bayesian_stream([
+            {
+                'mec_a_mutations': item.mecAMutations,
+                'pbp2a_mutations': item.pbp2aMutations,
+                'vancomycin_resistance_profile': item.vancomycinResistanceProfile,
+                'ceftaroline_resistance_profile': item.ceftarolineResistanceProfile,
+                'oxacillin_resistance_profile': item.oxacillinResistanceProfile
+            }
+            for item in request.inputs
+        ])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def ndjson():
+        writer = get_prediction_writer()
+        async for entry in results:
+            payload = request.inputs[entry['index']].model_dump()
+            writer.enqueue({
+                'type': 'bayesian',
+                'input': payload,
+                'output': entry['result']
+            })
+            yield _dumps_line({
+                'index': entry['index'],
+                'type': 'bayesian',
+                'input': payload,
+                'output': entry['result']
+            })
+    
+    return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+
+
 @app.post("/api/predictions/evolutionary", response_model=PredictionResponse)
 async def create_evolutionary_prediction(request: EvolutionaryPredictionRequest):
     """Create an evolutionary resistance prediction."""
     try:
-        result = await predict_resistance_emergence(
-            mutation_patterns=request.mutationPatterns,
-            evolutionary_trajectories=request.evolutionaryTrajectories,
-            existing_knowledge=request.existingKnowledge
-        )
+        payload = request.model_dump()
+        result = await _run_prediction('evolutionary', payload)
         
         # Save to database
-        db = get_db()
-        prediction_id = db.add_prediction({
+        get_prediction_writer().enqueue({
             'type': 'evolutionary',
-            'input': {
-                'mutationPatterns': request.mutationPatterns,
-                'evolutionaryTrajectories': request.evolutionaryTrajectories,
-                'existingKnowledge': request.existingKnowledge
-            },
+            'input': payload,
             'output': result
         })
         
         return PredictionResponse(
             type='evolutionary',
-            input=request.dict(),
+            input=payload,
             output=result
         )
     except ValueError as e:
@@ -191,31 +524,19 @@ async def create_ml_prediction(request: MLPredictionRequest):
     - "ensemble": Combined SVM + Random Forest (default)
     """
     try:
-        result = await predict_resistance_ml(
-            mec_a_mutations=request.mecAMutations,
-            pbp2a_mutations=request.pbp2aMutations,
-            model_type=request.modelType,
-            sccmec_type=request.sccmecType,
-            additional_genes=request.additionalGenes
-        )
+        payload = request.model_dump()
+        result = await _run_prediction('ml', payload)
         
         # Save to database
-        db = get_db()
-        prediction_id = db.add_prediction({
+        get_prediction_writer().enqueue({
             'type': f'ml_{request.modelType}',
-            'input': {
-                'mecAMutations': request.mecAMutations,
-                'pbp2aMutations': request.pbp2aMutations,
-                'modelType': request.modelType,
-                'sccmecType': request.sccmecType,
-                'additionalGenes': request.additionalGenes
-            },
+            'input': payload,
             'output': result
         })
         
         return PredictionResponse(
             type=f'ml_{request.modelType}',
-            input=request.dict(),
+            input=payload,
             output=result
         )
     except ValueError as e:
@@ -233,31 +554,19 @@ async def create_oxacillin_prediction(request: OxacillinPredictionRequest):
     comprehensive oxacillin resistance assessment.
     """
     try:
-        result = await predict_oxacillin_resistance(
-            mec_a_mutations=request.mecAMutations,
-            pbp2a_mutations=request.pbp2aMutations,
-            sccmec_type=request.sccmecType,
-            additional_genes=request.additionalGenes,
-            strain_info=request.strainInfo
-        )
+        payload = request.model_dump()
+        result = await _run_prediction('oxacillin', payload)
         
         # Save to database
-        db = get_db()
-        prediction_id = db.add_prediction({
+        get_prediction_writer().enqueue({
             'type': 'oxacillin',
-            'input': {
-                'mecAMutations': request.mecAMutations,
-                'pbp2aMutations': request.pbp2aMutations,
-                'sccmecType': request.sccmecType,
-                'additionalGenes': request.additionalGenes,
-                'strainInfo': request.strainInfo
-            },
+            'input': payload,
             'output': result
         })
         
         return PredictionResponse(
             type='oxacillin',
-            input=request.dict(),
+            input=payload,
             output=result
         )
     except ValueError as e:
@@ -266,6 +575,52 @@ async def create_oxacillin_prediction(request: OxacillinPredictionRequest):
         raise HTTPException(status_code=500, detail=f"Oxacillin prediction failed: {str(e)}")
 
 
+_WEBHOOK_URL = TypeAdapter(AnyHttpUrl)
+
+
+async def _submit_prediction_job(prediction_type: str, request: BaseModel) -> AsyncPredictionResponse:
+    """Queue a prediction job and return its request ID (400 if webhookEndpoint is not an allowed http(s) URL)."""
+    try:
+        _WEBHOOK_URL.validate_python(request.webhookEndpoint)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="webhookEndpoint must be an absolute http(s) URL")
+    try:
+        request_id = await prediction_jobs.submit(
+            prediction_type,
+            request.model_dump(exclude={'webhookEndpoint'}),
+            request.webhookEndpoint
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue prediction: {str(e)}")
+    return AsyncPredictionResponse(request_id=request_id)
+
+
+@app.post("/api/predictions/bayesian/async", response_model=AsyncPredictionResponse, status_code=202)
+async def create_bayesian_prediction_async(request: BayesianAsyncPredictionRequest):
+    """Queue a Bayesian prediction; the result is POSTed to webhookEndpoint."""
+    return await _submit_prediction_job('bayesian', request)
+
+
+@app.post("/api/predictions/evolutionary/async", response_model=AsyncPredictionResponse, status_code=202)
+async def create_evolutionary_prediction_async(request: EvolutionaryAsyncPredictionRequest):
+    """Queue an evolutionary prediction; the result is POSTed to webhookEndpoint."""
+    return await _submit_prediction_job('evolutionary', request)
+
+
+@app.post("/api/predictions/ml/async", response_model=AsyncPredictionResponse, status_code=202)
+async def create_ml_prediction_async(request: MLAsyncPredictionRequest):
+    """Queue a Machine Learning prediction; the result is POSTed to webhookEndpoint."""
+    return await _submit_prediction_job('ml', request)
+
+
+@app.post("/api/predictions/oxacillin/async", response_model=AsyncPredictionResponse, status_code=202)
+async def create_oxacillin_prediction_async(request: OxacillinAsyncPredictionRequest):
+    """Queue an oxacillin prediction; the result is POSTed to webhookEndpoint."""
+    return await _submit_prediction_job('oxacillin', request)
+
+
 @app.get("/api/predictions")
 async def list_predictions(limit: int = 10):
     """List recent predictions."""
@@ -292,57 +647,60 @@ async def get_graph(graph_id: int):
         raise HTTPException(status_code=500, detail=f"Failed to load graph: {str(e)}")
 
 
+_MODELS = _StaticJSON({
+    "models": [
+        {
+            "id": "bayesian",
+            "name": "Bayesian Network Model",
+            "description": "AI-powered Bayesian network for resistance probability estimation",
+            "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
+            "features": ["mutation_analysis", "frequency_integration", "ai_rationale"]
+        },
+        {
+            "id": "evolutionary",
+            "name": "Evolutionary Resistance Predictor",
+            "description": "Models evolutionary trajectories of resistance emergence",
+            "antibiotics": ["general_resistance"],
+            "features": ["trajectory_modeling", "co_occurrence_analysis", "intervention_suggestions"]
+        },
+        {
+            "id": "svm",
+            "name": "Support Vector Machine",
+            "description": "SVM classifier trained on MRSA resistance data",
+            "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
+            "features": ["probability_estimation", "feature_importance"]
+        },
+        {
+            "id": "random_forest",
+            "name": "Random Forest",
+            "description": "Random Forest classifier with 50 decision trees",
+            "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
+            "features": ["probability_estimation", "feature_importance", "tree_ensemble"]
+        },
+        {
+            "id": "ensemble",
+            "name": "Ensemble Model",
+            "description": "Combined SVM + Random Forest for robust predictions",
+            "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
+            "features": ["weighted_averaging", "model_comparison", "high_confidence"]
+        },
+        {
+            "id": "oxacillin",
+            "name": "Oxacillin Specialist",
+            "description": "Specialized model for oxacillin resistance with SCCmec analysis",
+            "antibiotics": ["oxacillin"],
+            "features": ["sccmec_analysis", "high_risk_mutation_detection", "strain_classification"]
+        }
+    ]
+})
+
+
 @app.get("/api/models")
-async def list_models():
+async def list_models(request: Request):
     """List available ML models and their descriptions."""
-    return {
-        "models": [
-            {
-                "id": "bayesian",
-                "name": "Bayesian Network Model",
-                "description": "AI-powered Bayesian network for resistance probability estimation",
-                "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
-                "features": ["mutation_analysis", "frequency_integration", "ai_rationale"]
-            },
-            {
-                "id": "evolutionary",
-                "name": "Evolutionary Resistance Predictor",
-                "description": "Models evolutionary trajectories of resistance emergence",
-                "antibiotics": ["general_resistance"],
-                "features": ["trajectory_modeling", "co_occurrence_analysis", "intervention_suggestions"]
-            },
-            {
-                "id": "svm",
-                "name": "Support Vector Machine",
-                "description": "SVM classifier trained on MRSA resistance data",
-                "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
-                "features": ["probability_estimation", "feature_importance"]
-            },
-            {
-                "id": "random_forest",
-                "name": "Random Forest",
-                "description": "Random Forest classifier with 100 decision trees",
-                "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
-                "features": ["probability_estimation", "feature_importance", "tree_ensemble"]
-            },
-            {
-                "id": "ensemble",
-                "name": "Ensemble Model",
-                "description": "Combined SVM + Random Forest for robust predictions",
-                "antibiotics": ["oxacillin", "vancomycin", "ceftaroline"],
-                "features": ["weighted_averaging", "model_comparison", "high_confidence"]
-            },
-            {
-                "id": "oxacillin",
-                "name": "Oxacillin Specialist",
-                "description": "Specialized model for oxacillin resistance with SCCmec analysis",
-                "antibiotics": ["oxacillin"],
-                "features": ["sccmec_analysis", "high_risk_mutation_detection", "strain_classification"]
-            }
-        ]
-    }
-
+    return _MODELS.response(request)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=9000)
+    # Keep probe/LB connections open longer than typical LB idle timeouts (60s)
+    uvicorn.run(app, host="0.0.0.0", port=9000, timeout_keep_alive=75)
@@ -0,0 +1,111 @@
+"""Response cache for repeated prediction requests."""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from db.sqlite_db import get_db
+
+
+class PredictionCache:
+    """
+    TTL + LRU cache of prediction outputs keyed by a canonical request hash.
+    
+    Concurrent misses for the same key share one computation. Entries are
+    mirrored to the prediction_cache table so a restarted server starts warm.
+    Outputs with a false ``cacheable`` attribute (heuristic fallbacks after a
+    failed model call) are returned but never stored.
+    """
+    
+    def __init__(self, maxsize: int = 4096, ttl: int = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry, JSON-encoded output); decoded per hit so callers get their own copy
+        self._entries: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get(self, key: bytes) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def _put(self, key: bytes, encoded: str, age: float = 0.0) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl - age, encoded)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    async def _load(self, key: bytes) -> Optional[Tuple[str, float]]:
+        """Read an unexpired entry from the SQLite mirror (a failure is a miss)."""
+        try:
+            return await asyncio.to_thread(get_db().get_cached_prediction, key, self.ttl)
+        except Exception as e:
+            print(f"Warning: prediction cache read failed: {e}")
+            return None
+    
+    async def _store(self, key: bytes, encoded: str) -> None:
+        """Mirror an entry to SQLite; the in-memory entry is enough if this fails."""
+        try:
+            await asyncio.to_thread(get_db().put_cached_prediction, key, encoded, self.ttl)
+        except Exception as e:
+            print(f"Warning: prediction cache write failed: {e}")
+    
+    async def get_or_compute(self, key: bytes, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the cached output for key, computing and storing it on a miss.
+        
+        Args:
+            key: Canonical request hash
+            compute: Coroutine factory producing the prediction output; its
+                exceptions propagate to every waiter and nothing is cached
+        """
+        encoded = self._get(key)
+        if encoded is not None:
+            return json.loads(encoded)
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # In-flight futures belong to one event loop
+            self._loop = loop
+            self._inflight = {}
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return json.loads(await asyncio.shield(inflight))
+        
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            stored = await self._load(key)
+            if stored is not None:
+                encoded, age = stored
+                self._put(key, encoded, age)
+            else:
+                output = await compute()
+                encoded = json.dumps(output)
+                if getattr(output, 'cacheable', True):
+                    self._put(key, encoded)
+                    await self._store(key, encoded)
+            future.set_result(encoded)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't let an unobserved future warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return json.loads(encoded)
+    
+    def clear(self) -> None:
+        """Drop in-memory entries (the SQLite mirror still expires by TTL)."""
+        self._entries.clear()
@@ -0,0 +1,193 @@
+"""Background prediction jobs delivered to client webhooks."""
+import asyncio
+import ipaddress
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from db.sqlite_db import get_db, get_prediction_writer
+
+Runner = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Webhook responses that mean "try again later" rather than "rejected"
+_RETRY_STATUSES = frozenset({408, 429})
+
+
+class PredictionJobQueue:
+    """
+    Run predictions in the background and POST each result to a webhook.
+    
+    Accepted jobs are stored in the predictions_pending table until their
+    webhook has been called, so jobs interrupted by a restart are resumed
+    on the next startup. The computed payload is stored with the job, so a
+    resumed job is re-delivered rather than recomputed; a job whose webhook
+    fails delivery_rounds times (each of webhook_attempts tries) is dropped.
+    
+    Webhooks may only point at public addresses, so the server cannot be
+    used to POST into its own network; hosts in allowed_hosts are exempt.
+    """
+    
+    def __init__(self, runners: Dict[str, Runner], workers: int = 4,
+                 webhook_attempts: int = 3, webhook_timeout: float = 10.0,
+                 delivery_rounds: int = 5, allowed_hosts: Iterable[str] = ()):
+        self.runners = runners
+        self.allowed_hosts = frozenset(host.strip().lower() for host in allowed_hosts if host.strip())
+        self.workers = workers
+        self.webhook_attempts = webhook_attempts
+        self.webhook_timeout = webhook_timeout
+        self.delivery_rounds = delivery_rounds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _ensure_started(self) -> None:
+        """Start the workers on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._client = httpx.AsyncClient(timeout=self.webhook_timeout)
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+    
+    async def submit(self, prediction_type: str, input_data: Dict[str, Any], webhook_endpoint: str) -> str:
+        """
+        Accept a prediction job and return its request ID immediately.
+        
+        Args:
+            prediction_type: Key into the runners passed to the constructor
+            input_data: Request fields, as stored with the prediction
+            webhook_endpoint: URL that receives the result as a JSON POST
+        
+        Returns:
+            The request ID, which is echoed in the webhook payload
+        """
+        if prediction_type not in self.runners:
+            raise ValueError(f"Unknown prediction type: {prediction_type}")
+        problem = await self.webhook_problem(webhook_endpoint)
+        if problem:
+            raise ValueError(f"webhookEndpoint {problem}")
+        self._ensure_started()
+        request_id = str(uuid.uuid4())
+        await asyncio.to_thread(
+            get_db().add_pending_prediction, request_id, prediction_type, input_data, webhook_endpoint
+        )
+        self._queue.put_nowait((request_id, prediction_type, input_data, webhook_endpoint))
+        return request_id
+    
+    async def webhook_problem(self, webhook_endpoint: str) -> Optional[str]:
+        """Why results must not be POSTed to this URL, or None if they may."""
+        host = urlsplit(webhook_endpoint).hostname
+        if not host:
+            return "has no host"
+        if host in self.allowed_hosts:
+            return None
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            return f"host {host} does not resolve"
+        for *_, sockaddr in infos:
+            address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+            if not address.is_global or address.is_multicast:
+                return f"host {host} resolves to a non-public address ({address})"
+        return None
+    
+    async def resume(self) -> int:
+        """Re-queue jobs left pending by a previous run; returns how many."""
+        self._ensure_started()
+        pending = await asyncio.to_thread(get_db().list_pending_predictions)
+        for job in pending:
+            self._queue.put_nowait((job['request_id'], job['type'], job['input'], job['webhook_endpoint'],
+                                    job['payload'], job['attempts']))
+        return len(pending)
+    
+    async def _run(self) -> None:
+        """Worker loop: take jobs off the queue one at a time."""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(*job)
+            except Exception as e:
+                print(f"Warning: prediction job {job[0]} failed: {e}")
+    
+    async def _process(self, request_id: str, prediction_type: str, input_data: Dict[str, Any],
+                       webhook_endpoint: str, payload: Optional[Dict[str, Any]] = None,
+                       attempts: int = 0) -> None:
+        """Run one job (unless its payload is already stored) and deliver it to the webhook."""
+        if payload is None:
+            payload = await self._compute(request_id, prediction_type, input_data)
+            await asyncio.to_thread(get_db().set_pending_payload, request_id, payload)
+        
+        # Checked again here: DNS may have changed since submit, and resumed jobs predate the check
+        problem = await self.webhook_problem(webhook_endpoint)
+        if problem:
+            print(f"Warning: dropping prediction job {request_id}: webhook {problem}")
+            await asyncio.to_thread(get_db().remove_pending_prediction, request_id)
+        elif await self._deliver(webhook_endpoint, payload):
+            await asyncio.to_thread(get_db().remove_pending_prediction, request_id)
+        elif attempts + 1 >= self.delivery_rounds:
+            print(f"Warning: dropping prediction job {request_id} after {attempts + 1} failed delivery rounds")
+            await asyncio.to_thread(get_db().remove_pending_prediction, request_id)
+        else:
+            await asyncio.to_thread(get_db().record_pending_attempt, request_id)
+    
+    async def _compute(self, request_id: str, prediction_type: str,
+                       input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the prediction, save it and build the webhook payload."""
+        payload: Dict[str, Any] = {'request_id': request_id, 'type': prediction_type, 'input': input_data}
+        try:
+            result = await self.runners[prediction_type](input_data)
+        except Exception as e:
+            payload['status'] = 'error'
+            payload['error'] = str(e)
+            return payload
+        
+        try:
+            await get_prediction_writer().enqueue({
+                'type': prediction_type,
+                'input': input_data,
+                'output': result
+            })
+        except Exception:
+            # The writer logs the failure; the prediction itself still succeeded
+            pass
+        payload['status'] = 'success'
+        payload['output'] = result
+        return payload
+    
+    async def _deliver(self, webhook_endpoint: str, payload: Dict[str, Any]) -> bool:
+        """
+        POST the payload with exponential backoff; True once the webhook answers.
+        
+        5xx, 408 and 429 responses are retried; any other 4xx is logged and
+        counts as delivered, since sending the same payload again won't help.
+        """
+        for attempt in range(self.webhook_attempts):
+            try:
+                response = await self._client.post(webhook_endpoint, json=payload)
+                if response.status_code < 500 and response.status_code not in _RETRY_STATUSES:
+                    if response.is_error:
+                        print(f"Warning: webhook {webhook_endpoint} rejected {payload['request_id']}: "
+                              f"HTTP {response.status_code}")
+                    return True
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                print(f"Warning: webhook {webhook_endpoint} unreachable: {e}")
+            if attempt + 1 < self.webhook_attempts:
+                await asyncio.sleep(2 ** attempt)
+        print(f"Warning: giving up on webhook for {payload['request_id']} until the next startup")
+        return False
+    
+    async def aclose(self) -> None:
+        """Stop the workers and close the webhook client (pending jobs resume on restart)."""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,55 +1,112 @@
 """API endpoint for scraping data."""
-from fastapi import APIRouter
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from data.scrapers import get_dataset_manager
 
 router = APIRouter()
 
-@router.post("/api/scrape-data")
-async def scrape_data():
-    """Trigger data scraping from all three sources."""
+# State of the background scrape started by POST /api/scrape-data
+scrape_status: Dict[str, Any] = {
+    "state": "idle",  # "idle", "running", or "error"
+    "started_at": None,
+    "finished_at": None,
+    "message": None
+}
+_scrape_lock = asyncio.Lock()
+
+# All dataset counts in one statement
+_STATS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM ncbi_isolates),
+        (SELECT COUNT(*) FROM card_genes),
+        (SELECT COUNT(*) FROM card_mutations),
+        (SELECT COUNT(*) FROM pubmlst_sts),
+        (SELECT COUNT(*) FROM mutation_frequencies)
+"""
+
+# Read-only connection reused across stats requests
+_stats_conn: Optional[sqlite3.Connection] = None
+_stats_conn_path: Optional[str] = None
+_stats_lock = threading.Lock()
+
+async def _run_scrape():
+    """Scrape all sources in a worker thread and record the outcome in scrape_status."""
     try:
         manager = get_dataset_manager()
-        manager.scrape_all(force_refresh=True)
-        return {
-            "status": "success",
-            "message": "Data scraped successfully from NCBI, CARD, and PubMLST",
-            "sources": ["NCBI Pathogen Detection", "CARD", "PubMLST"]
-        }
+        await asyncio.to_thread(manager.scrape_all, force_refresh=True)
+        scrape_status.update(state="idle", message=None)
     except Exception as e:
-        return {
-            "status": "error",
-            "message": str(e)
-        }
+        scrape_status.update(state="error", message=str(e))
+    finally:
+        scrape_status["finished_at"] = datetime.now().isoformat()
+
+@router.post("/api/scrape-data", status_code=202)
+async def scrape_data(background_tasks: BackgroundTasks):
+    """Start scraping all three sources in the background; poll /api/scrape-data/status."""
+    async with _scrape_lock:
+        if scrape_status["state"] == "running":
+            raise HTTPException(status_code=409, detail="A scrape is already running")
+        scrape_status.update(
+            state="running",
+            started_at=datetime.now().isoformat(),
+            finished_at=None,
+            message=None
+        )
+    background_tasks.add_task(_run_scrape)
+    return {
+        "status": "accepted",
+        "message": "Scraping NCBI, CARD, and PubMLST in the background",
+        "sources": ["NCBI Pathogen Detection", "CARD", "PubMLST"],
+        "poll": "/api/scrape-data/status"
+    }
+
+@router.get("/api/scrape-data/status")
+async def get_scrape_status():
+    """Get the state of the most recent background scrape."""
+    return dict(scrape_status)
+
+def _stats_connection(db_path: str) -> sqlite3.Connection:
+    """Get the shared read-only connection for dataset stats (reopened if the path changes)."""
+    global _stats_conn, _stats_conn_path
+    if _stats_conn is None or _stats_conn_path != db_path:
+        if _stats_conn is not None:
+            _stats_conn.close()
+        _stats_conn = sqlite3.connect(
+            Path(db_path).as_uri() + '?mode=ro', uri=True, check_same_thread=False
+        )
+        _stats_conn_path = db_path
+    return _stats_conn
+
+def _count_datasets(db_path: str) -> tuple:
+    """Count rows in every dataset table with one query."""
+    with _stats_lock:
+        return _stats_connection(db_path).execute(_STATS_QUERY).fetchone()
 
 @router.get("/api/dataset-stats")
 async def get_dataset_stats():
     """Get statistics about scraped datasets."""
     try:
         manager = get_dataset_manager()
-        import sqlite3
-        
-        conn = sqlite3.connect(manager.db_path)
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # NCBI stats
-        cursor.execute("SELECT COUNT(*) FROM ncbi_isolates")
-        stats["ncbi_isolates"] = cursor.fetchone()[0]
-        
-        # CARD stats
-        cursor.execute("SELECT COUNT(*) FROM card_genes")
-        stats["card_genes"] = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM card_mutations")
-        stats["card_mutations"] = cursor.fetchone()[0]
-        
-        # PubMLST stats
-        cursor.execute("SELECT COUNT(*) FROM pubmlst_sts")
-        stats["pubmlst_sequence_types"] = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM mutation_frequencies")
-        stats["mutation_frequencies"] = cursor.fetchone()[0]
-        
-        conn.close()
+        (
+            ncbi_isolates,
+            card_genes,
+            card_mutations,
+            pubmlst_sequence_types,
+            mutation_frequencies
+        ) = await asyncio.to_thread(_count_datasets, manager.db_path)
+        stats = {
+            "ncbi_isolates": ncbi_isolates,
+            "card_genes": card_genes,
+            "card_mutations": card_mutations,
+            "pubmlst_sequence_types": pubmlst_sequence_types,
+            "mutation_frequencies": mutation_frequencies
+        }
         
         return {
             "status": "success",
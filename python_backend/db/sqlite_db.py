@@ -1,7 +1,9 @@
 """SQLite database operations for predictions and charts."""
 import sqlite3
 import json
-from typing import Dict, List, Optional, Any
+import asyncio
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 
@@ -19,12 +21,17 @@ class SQLiteDB:
             # Ensure directory exists
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = os.path.abspath(db_path)  # Use absolute path
+        # One long-lived connection for all writes, serialized by a lock
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
         self._init_db()
     
-    def _get_connection(self) -> sqlite3.Connection:
+    def _get_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
         """Get a database connection."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=check_same_thread)
         conn.row_factory = sqlite3.Row
+        # WAL (set once in _init_db) only needs a full sync at checkpoints
+        conn.execute("PRAGMA synchronous=NORMAL")
         return conn
     
     def _init_db(self):
@@ -32,6 +39,9 @@ class SQLiteDB:
         conn = self._get_connection()
         cursor = conn.cursor()
         
+        # Readers no longer block the writer (persists in the database file)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Create tables
         cursor.executescript("""
             CREATE TABLE IF NOT EXISTS predictions (
@@ -80,6 +90,22 @@ class SQLiteDB:
                 image BLOB,
                 FOREIGN KEY (chart_id) REFERENCES charts(id) ON DELETE CASCADE
             );
+
+            CREATE TABLE IF NOT EXISTS predictions_pending (
+                request_id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                input TEXT NOT NULL,
+                webhook_endpoint TEXT NOT NULL,
+                payload TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS prediction_cache (
+                key BLOB PRIMARY KEY,
+                output TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
         """)
         
         # Migration: add bayesian probability columns if missing
@@ -93,106 +119,211 @@ class SQLiteDB:
         except Exception:
             pass
         
+        # Migration: pending jobs keep their computed payload and delivery attempts
+        try:
+            cursor.execute("PRAGMA table_info(predictions_pending)")
+            cols = [row[1] for row in cursor.fetchall()]
+            if 'payload' not in cols:
+                cursor.execute("ALTER TABLE predictions_pending ADD COLUMN payload TEXT")
+            if 'attempts' not in cols:
+                cursor.execute("ALTER TABLE predictions_pending ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        except Exception:
+            pass
+        
         conn.commit()
         conn.close()
     
     def add_prediction(self, prediction_data: Dict[str, Any]) -> int:
         """Add a prediction to the database."""
+        return self.add_predictions([prediction_data])[0]
+    
+    def add_predictions(self, predictions: List[Dict[str, Any]]) -> List[int]:
+        """Add several predictions in a single transaction and return their IDs."""
+        with self._write_lock:
+            if self._write_conn is None:
+                # Used from whichever thread holds the lock
+                self._write_conn = self._get_connection(check_same_thread=False)
+            conn = self._write_conn
+            try:
+                cursor = conn.cursor()
+                ids = [self._insert_prediction(cursor, prediction_data) for prediction_data in predictions]
+                conn.commit()
+                return ids
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def _write(self, *statements: Tuple[str, Tuple]) -> None:
+        """Run (sql, params) write statements in one transaction on the shared write connection."""
+        with self._write_lock:
+            if self._write_conn is None:
+                self._write_conn = self._get_connection(check_same_thread=False)
+            try:
+                for sql, params in statements:
+                    self._write_conn.execute(sql, params)
+                self._write_conn.commit()
+            except Exception:
+                self._write_conn.rollback()
+                raise
+    
+    def add_pending_prediction(self, request_id: str, prediction_type: str,
+                               input_data: Dict[str, Any], webhook_endpoint: str) -> None:
+        """Record an accepted async prediction job until its result is delivered."""
+        self._write((
+            "INSERT INTO predictions_pending (request_id, type, input, webhook_endpoint) VALUES (?, ?, ?, ?)",
+            (request_id, prediction_type, json.dumps(input_data), webhook_endpoint)
+        ))
+    
+    def set_pending_payload(self, request_id: str, payload: Dict[str, Any]) -> None:
+        """Store the webhook payload of a computed job so a restart re-delivers it instead of recomputing."""
+        self._write((
+            "UPDATE predictions_pending SET payload = ? WHERE request_id = ?",
+            (json.dumps(payload), request_id)
+        ))
+    
+    def record_pending_attempt(self, request_id: str) -> None:
+        """Count one failed round of webhook delivery for a pending job."""
+        self._write(("UPDATE predictions_pending SET attempts = attempts + 1 WHERE request_id = ?", (request_id,)))
+    
+    def remove_pending_prediction(self, request_id: str) -> None:
+        """Drop a finished async prediction job."""
+        self._write(("DELETE FROM predictions_pending WHERE request_id = ?", (request_id,)))
+    
+    def list_pending_predictions(self) -> List[Dict[str, Any]]:
+        """List async prediction jobs that were accepted but not yet delivered."""
         conn = self._get_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Insert prediction
-            cursor.execute("INSERT INTO predictions (type) VALUES (?)", (prediction_data['type'],))
-            prediction_id = cursor.lastrowid
-            
-            # Insert inputs
-            input_data = prediction_data.get('input', {})
-            for key, value in input_data.items():
-                if isinstance(value, list):
-                    value = ', '.join(str(v) for v in value)
-                else:
-                    value = str(value) if value is not None else ''
-                cursor.execute(
-                    "INSERT INTO prediction_inputs (prediction_id, key, value) VALUES (?, ?, ?)",
-                    (prediction_id, key, value)
-                )
+            rows = conn.execute(
+                """SELECT request_id, type, input, webhook_endpoint, payload, attempts
+                   FROM predictions_pending ORDER BY created_at"""
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                'request_id': row['request_id'],
+                'type': row['type'],
+                'input': json.loads(row['input']),
+                'webhook_endpoint': row['webhook_endpoint'],
+                'payload': json.loads(row['payload']) if row['payload'] else None,
+                'attempts': row['attempts']
+            }
+            for row in rows
+        ]
+    
+    def get_cached_prediction(self, key: bytes, max_age: int) -> Optional[Tuple[str, float]]:
+        """Get a cached prediction output (JSON) and its age in seconds, if younger than max_age."""
+        conn = self._get_connection()
+        try:
+            row = conn.execute(
+                """SELECT output, (julianday('now') - julianday(created_at)) * 86400.0 AS age
+                   FROM prediction_cache WHERE key = ?""",
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None or row['age'] >= max_age:
+            return None
+        return row['output'], row['age']
+    
+    def put_cached_prediction(self, key: bytes, output: str, max_age: int) -> None:
+        """Store (or refresh) a cached prediction output (JSON) and drop entries older than max_age."""
+        self._write(
+            ("DELETE FROM prediction_cache WHERE created_at < datetime('now', ?)", (f'-{int(max_age)} seconds',)),
+            ("INSERT OR REPLACE INTO prediction_cache (key, output, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+             (key, output))
+        )
+    
+    def _insert_prediction(self, cursor: sqlite3.Cursor, prediction_data: Dict[str, Any]) -> int:
+        """Insert one prediction with its inputs, output and charts (no commit)."""
+        # Insert prediction
+        cursor.execute("INSERT INTO predictions (type) VALUES (?)", (prediction_data['type'],))
+        prediction_id = cursor.lastrowid
+        
+        # Insert inputs
+        input_data = prediction_data.get('input', {})
+        for key, value in input_data.items():
+            if isinstance(value, list):
+                value = ', '.join(str(v) for v in value)
+            else:
+                value = str(value) if value is not None else ''
+            cursor.execute(
+                "INSERT INTO prediction_inputs (prediction_id, key, value) VALUES (?, ?, ?)",
+                (prediction_id, key, value)
+            )
+        
+        # Insert output
+        output = prediction_data.get('output', {})
+        if prediction_data['type'] == 'bayesian':
+            van = output.get('vancomycinResistanceProbability')
+            cef = output.get('ceftarolineResistanceProbability')
+            conf = None
+            if van is not None and cef is not None:
+                conf = max(0, min(1, (van + cef) / 2))
             
-            # Insert output
-            output = prediction_data.get('output', {})
-            if prediction_data['type'] == 'bayesian':
-                van = output.get('vancomycinResistanceProbability')
-                cef = output.get('ceftarolineResistanceProbability')
-                conf = None
-                if van is not None and cef is not None:
-                    conf = max(0, min(1, (van + cef) / 2))
-                
-                cursor.execute(
-                    """INSERT INTO prediction_outputs 
-                       (prediction_id, summary, confidence, explanation, interventions, vancomycin_prob, ceftaroline_prob) 
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        prediction_id,
-                        None,
-                        conf,
-                        output.get('rationale'),
-                        output.get('solution'),
-                        van,
-                        cef
-                    )
+            cursor.execute(
+                """INSERT INTO prediction_outputs 
+                   (prediction_id, summary, confidence, explanation, interventions, vancomycin_prob, ceftaroline_prob) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    prediction_id,
+                    None,
+                    conf,
+                    output.get('rationale'),
+                    output.get('solution'),
+                    van,
+                    cef
                 )
-            else:
-                cursor.execute(
-                    """INSERT INTO prediction_outputs 
-                       (prediction_id, summary, confidence, explanation, interventions) 
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (
-                        prediction_id,
-                        output.get('resistancePrediction'),
-                        output.get('confidenceLevel'),
-                        output.get('inDepthExplanation'),
-                        output.get('suggestedInterventions')
-                    )
+            )
+        else:
+            cursor.execute(
+                """INSERT INTO prediction_outputs 
+                   (prediction_id, summary, confidence, explanation, interventions) 
+                   VALUES (?, ?, ?, ?, ?)""",
+                (
+                    prediction_id,
+                    output.get('resistancePrediction'),
+                    output.get('confidenceLevel'),
+                    output.get('inDepthExplanation'),
+                    output.get('suggestedInterventions')
                 )
+            )
+        
+        # Insert charts
+        charts = output.get('charts', [])
+        for chart in charts:
+            cursor.execute(
+                "INSERT INTO charts (prediction_id, title) VALUES (?, ?)",
+                (prediction_id, chart['title'])
+            )
+            chart_id = cursor.lastrowid
             
-            # Insert charts
-            charts = output.get('charts', [])
-            for chart in charts:
-                cursor.execute(
-                    "INSERT INTO charts (prediction_id, title) VALUES (?, ?)",
-                    (prediction_id, chart['title'])
-                )
-                chart_id = cursor.lastrowid
-                
-                # Insert chart data
-                for point in chart.get('data', []):
-                    cursor.execute(
-                        "INSERT INTO chart_data (chart_id, name, value) VALUES (?, ?, ?)",
-                        (chart_id, point['name'], point['value'])
-                    )
-                
-                # Insert chart meta
-                context = None
-                interpretation = None
-                if 'Contribution' in chart['title']:
-                    context = 'Relative contribution of named mutations to resistance risk, normalized to 0–1 under cautious interpretation.'
-                    interpretation = 'Higher values indicate greater inferred influence of the mutation on resistance risk. Values are observational, not diagnostic.'
-                elif 'Co-occurrence' in chart['title']:
-                    context = 'Frequency of mutation co-occurrence across isolates, normalized to 0–1.'
-                    interpretation = 'Higher values indicate mutations observed together more often across isolates. Association does not imply causation.'
-                else:
-                    context = 'Quantitative visualization of model-derived signals, normalized to 0–1.'
-                    interpretation = 'Values represent normalized magnitudes and should be interpreted cautiously in context of other evidence.'
-                
+            # Insert chart data
+            for point in chart.get('data', []):
                 cursor.execute(
-                    "INSERT INTO chart_meta (chart_id, context, interpretation, image) VALUES (?, ?, ?, NULL)",
-                    (chart_id, context, interpretation)
+                    "INSERT INTO chart_data (chart_id, name, value) VALUES (?, ?, ?)",
+                    (chart_id, point['name'], point['value'])
                 )
             
-            conn.commit()
-            return prediction_id
-        finally:
-            conn.close()
+            # Insert chart meta
+            context = None
+            interpretation = None
+            if 'Contribution' in chart['title']:
+                context = 'Relative contribution of named mutations to resistance risk, normalized to 0–1 under cautious interpretation.'
+                interpretation = 'Higher values indicate greater inferred influence of the mutation on resistance risk. Values are observational, not diagnostic.'
+            elif 'Co-occurrence' in chart['title']:
+                context = 'Frequency of mutation co-occurrence across isolates, normalized to 0–1.'
+                interpretation = 'Higher values indicate mutations observed together more often across isolates. Association does not imply causation.'
+            else:
+                context = 'Quantitative visualization of model-derived signals, normalized to 0–1.'
+                interpretation = 'Values represent normalized magnitudes and should be interpreted cautiously in context of other evidence.'
+            
+            cursor.execute(
+                "INSERT INTO chart_meta (chart_id, context, interpretation, image) VALUES (?, ?, ?, NULL)",
+                (chart_id, context, interpretation)
+            )
+        
+        return prediction_id
     
     def get_graph_by_id(self, chart_id: int) -> Optional[Dict[str, Any]]:
         """Get a graph/chart by ID."""
@@ -343,8 +474,96 @@ class SQLiteDB:
         return svg
 
 
+class PredictionWriter:
+    """
+    Queue predictions and persist them in batched transactions off the event loop.
+    
+    Predictions enqueued within max_delay_ms of each other (up to max_batch)
+    are written by one add_predictions call in a worker thread, so request
+    handlers neither wait for nor block on the commit.
+    """
+    
+    def __init__(self, db: SQLiteDB, max_batch: int = 64, max_delay_ms: float = 50.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: set = set()
+    
+    def enqueue(self, prediction_data: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a prediction for saving (must be called from the event loop).
+        
+        Returns:
+            Future resolving to the prediction ID; it may be ignored, write
+            errors are logged either way
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # The queue and futures belong to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+            self._pending = set()
+        
+        future = loop.create_future()
+        future.add_done_callback(self._log_failure)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        self._queue.put_nowait((prediction_data, future))
+        return future
+    
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        """Report write errors, which fire-and-forget callers never see."""
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Warning: failed to save prediction: {future.exception()}")
+    
+    async def _run(self) -> None:
+        """Collect queued predictions for up to max_delay, then write them together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+    
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Write one batch and resolve its futures."""
+        try:
+            ids = await asyncio.to_thread(self.db.add_predictions, [data for data, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad record rolls back the whole batch; retry row by row so only it fails
+                for item in batch:
+                    await self._write([item])
+                return
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), prediction_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(prediction_id)
+    
+    async def flush(self) -> None:
+        """Wait until everything queued so far is written (call on application shutdown)."""
+        if self._pending and self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
 # Global database instance
 _db_instance: Optional[SQLiteDB] = None
+_writer_instance: Optional[PredictionWriter] = None
 
 def get_db() -> SQLiteDB:
     """Get the global database instance."""
@@ -353,3 +572,10 @@ def get_db() -> SQLiteDB:
         _db_instance = SQLiteDB()
     return _db_instance
 
+def get_prediction_writer() -> PredictionWriter:
+    """Get the global batched prediction writer."""
+    global _writer_instance
+    if _writer_instance is None:
+        _writer_instance = PredictionWriter(get_db())
+    return _writer_instance
+
@@ -21,7 +21,8 @@ if __name__ == "__main__":
             "api.main:app",
             host="0.0.0.0",
             port=9000,
-            reload=False  # Disable reload to avoid issues
+            reload=False,  # Disable reload to avoid issues
+            timeout_keep_alive=75  # Outlive typical load balancer idle timeouts (60s)
         )
     except Exception as e:
         print(f"Error starting backend: {e}")
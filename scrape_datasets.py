@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Script to scrape data from the three main datasets."""
+import logging
 import sys
 import os
 
@@ -10,6 +11,8 @@ from data.scrapers import get_dataset_manager
 
 def main():
     """Main function to scrape all datasets."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("=" * 60)
     print("🧬 MRSA Dataset Scraper")
     print("=" * 60)